@@ -7,6 +7,7 @@ import argparse
 import json
 import sys
 from argparse import Namespace
+from functools import lru_cache
 from typing import Optional
 
 from datetime import timedelta
@@ -22,6 +23,11 @@ from .config import config
 from .logger import logger
 
 
+# 分钟全量同步的跨股票写缓冲阈值（行）：攒到这个量级再开一次事务落库，
+# 摊薄每次连接/提交的固定开销；同时约束峰值内存，维持逐股票流式语义
+_MIN_WRITE_FLUSH_ROWS = 200_000
+
+
 def infer_market(code: str) -> int:
     """从股票代码推断市场：sh/sz 前缀直接判定；6 位纯数字按首位（6/68 沪，其余深）"""
     c = code.lower()
@@ -40,6 +46,7 @@ def sync_single_stock_min_data(
     code: str,
     start_date: Optional[str] = None,
     incremental: bool = True,
+    write_buffer: Optional[list] = None,
 ) -> bool:
     """处理并存储单只股票的分钟数据
 
@@ -51,6 +58,8 @@ def sync_single_stock_min_data(
         code: 股票代码
         start_date: 开始日期
         incremental: 是否启用精确增量
+        write_buffer: 跨股票写缓冲（全量同步编排传入）：待写帧 append
+            进去由调用方攒批落库，而不是本函数每股票各开一个事务
     """
     # DB 中 code 为纯 6 位数字（reader 写入时会截取），查询时需匹配
     db_code = code[-6:] if len(code) > 6 else code
@@ -61,17 +70,18 @@ def sync_single_stock_min_data(
         logger.warning(f"{code} 无5分钟数据")
         return False
 
-    # 准备 datetime 索引
+    # 准备 datetime 列（resample 直接按 on='datetime' 分 bin，无需设索引）
     if not pd.api.types.is_datetime64_any_dtype(df_5min['datetime']):
         df_5min['datetime'] = pd.to_datetime(df_5min['datetime'])
-    df_5min['date'] = df_5min['datetime'].dt.date
-    df_5min = df_5min.set_index('datetime')
+    # normalize 保持 datetime64（当日零点），不像 .dt.date 逐行生成
+    # Python date 对象；表内 date 列本就是 DateTime 类型
+    df_5min['date'] = df_5min['datetime'].dt.normalize()
 
-    # 重采样为多周期
+    # 重采样为多周期：级联 5→15→30→60（bin 边界逐级嵌套，结果与
+    # 各自从 5 分钟直接重采样一致，聚合工作量约省 2/3）
     df_15min = DataProcessor.resample_ohlcv(df_5min, '15min')
-    df_30min = DataProcessor.resample_ohlcv(df_5min, '30min')
-    df_60min = DataProcessor.resample_ohlcv(df_5min, '60min')
-    df_5min = df_5min.reset_index()
+    df_30min = DataProcessor.resample_ohlcv(df_15min, '30min')
+    df_60min = DataProcessor.resample_ohlcv(df_30min, '60min')
 
     # 处理、筛选、存储各周期
     freq_data = [
@@ -82,6 +92,7 @@ def sync_single_stock_min_data(
     ]
 
     has_data = False
+    pending = []
     for df, freq, table_name in freq_data:
         processed = processor.process_min_data(df)
         # 增量起点按表分别计算（issue #11）：只查 minute5 的话，
@@ -97,18 +108,50 @@ def sync_single_stock_min_data(
             continue
         has_data = True
         if incremental:
-            storage.save_incremental(processed, table_name)
+            # 攒起来最后单事务写入：4 张表共用一个连接、一次提交
+            pending.append((processed, table_name, ('code', 'datetime')))
         else:
             storage.save_minute_data(processed, freq=freq, to_csv=False, to_db=True)
 
+    if pending:
+        if write_buffer is not None:
+            write_buffer.extend(pending)
+        else:
+            storage.save_incremental_many(pending)
+
     if has_data:
-        logger.debug(f"{code} 分钟数据已处理并存入数据库")
+        logger.debug("%s 分钟数据已处理并存入数据库", code)
     else:
-        logger.debug(f"{code} 无新数据需要同步")
+        logger.debug("%s 无新数据需要同步", code)
 
     return True
 
 
+def _bounded_thread_map(fn, items, workers: int):
+    """有界并行 map：在途任务不超过 2×workers，按提交顺序产出结果
+
+    用于读取+处理阶段的流水线化——不限窗口的 executor.map 会把
+    全市场数据一次性读进内存，违背逐股票流式的内存约束。
+    workers<=1 时退化为纯串行。
+    """
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        pending = deque()
+        for item in items:
+            pending.append(ex.submit(fn, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 def sync_all_daily_data(
     reader: TdxDataReader,
     processor: DataProcessor,
@@ -119,18 +162,42 @@ def sync_all_daily_data(
 
     start_date=None 时按股票精确增量（查各自的 MAX(date)）。
     全表 MAX(date) 做起点会把库里没有的新股全历史过滤掉（2026-06-12 科创/301 首次同步踩坑）。
+
+    读取+均线计算在 SYNC_WORKERS 个线程中并行（pytdx 读文件是 I/O，
+    polars/numba 均线不持 GIL），写库保持主线程串行，落库顺序与语义不变。
     """
     try:
         stocks = reader.get_stock_list()
         logger.info(f"同步日线数据，共 {len(stocks)} 只股票")
 
-        iterator = tqdm(stocks.iterrows(), total=len(stocks)) if config.use_tqdm else stocks.iterrows()
+        def _read_and_process(stock_code):
+            """工作线程：读取 + 处理单只股票，返回 (code, df或None, 异常或None)"""
+            market = 1 if stock_code.startswith('sh') else 0
+            try:
+                data = reader.read_daily_data(market, stock_code)
+                if isinstance(data.index, pd.DatetimeIndex) or data.index.name == 'datetime':
+                    data = data.reset_index()
+                if data.empty:
+                    return stock_code, None, None
+                return stock_code, processor.process_daily_data(data), None
+            except FileNotFoundError:
+                return stock_code, None, None
+            except Exception as e:
+                return stock_code, None, e
+
+        results = _bounded_thread_map(
+            _read_and_process, stocks['code'], config.sync_workers)
+        iterator = tqdm(results, total=len(stocks)) if config.use_tqdm else results
         total_inserted = 0
         failed = 0
 
-        for _, stock in iterator:
-            code = stock['code']
-            market = 1 if code.startswith('sh') else 0
+        for code, processed, error in iterator:
+            if error is not None:
+                failed += 1
+                logger.error(f"同步 {code} 日线数据时出错: {error}")
+                continue
+            if processed is None:
+                continue
             try:
                 # 精确增量：该股票自己的最新日期；新股 latest=None → 全历史
                 stock_start = start_date
@@ -141,13 +208,6 @@ def sync_all_daily_data(
                     if latest:
                         stock_start = (latest + timedelta(days=1)).strftime('%Y-%m-%d')
 
-                data = reader.read_daily_data(market, code)
-                if isinstance(data.index, pd.DatetimeIndex) or data.index.name == 'datetime':
-                    data = data.reset_index()
-                if data.empty:
-                    continue
-
-                processed = processor.process_daily_data(data)
                 filtered = processor.filter_data(processed, start_date=stock_start)
                 if filtered.empty:
                     continue
@@ -158,8 +218,6 @@ def sync_all_daily_data(
                     batch_size=config.db_batch_size
                 )
                 total_inserted += inserted
-            except FileNotFoundError:
-                continue
             except Exception as e:
                 failed += 1
                 logger.error(f"同步 {code} 日线数据时出错: {e}")
@@ -181,6 +239,69 @@ def sync_all_daily_data(
         return False
 
 
+def stream_all_daily_data(
+    reader: TdxDataReader,
+    processor: DataProcessor,
+    storage: DataStorage,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    to_csv: bool = True,
+    to_db: bool = True,
+    incremental: bool = False,
+) -> int:
+    """逐股票流式读取→处理→写出日线数据（daily 子命令全市场路径）
+
+    替代旧的 read_all_daily_data() 一次性物化全市场 DataFrame：
+    峰值内存从全市场日线降到单只股票；CSV 改为逐股票追加写出。
+
+    Returns:
+        int: 写出的总行数
+    """
+    stocks = reader.get_stock_list()
+    logger.info(f"获取到 {len(stocks)} 只股票，开始流式处理日线数据...")
+
+    iterator = tqdm(stocks.iterrows(), total=len(stocks)) if config.use_tqdm else stocks.iterrows()
+    total = 0
+    csv_started = False
+
+    for _, stock in iterator:
+        code = stock['code']
+        market = 1 if code.startswith('sh') else 0
+        try:
+            data = reader.read_daily_data(market, code)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            logger.error(f"读取 {code} 日线数据时出错: {e}")
+            continue
+
+        if isinstance(data.index, pd.DatetimeIndex) or data.index.name == 'datetime':
+            data = data.reset_index()
+        if data.empty:
+            continue
+
+        processed = processor.process_daily_data(data)
+        filtered = processor.filter_data(processed, start_date=start_date, end_date=end_date)
+        if filtered.empty:
+            continue
+
+        if to_csv:
+            storage.save_to_csv(filtered, 'daily_data', append=csv_started)
+            csv_started = True
+        if to_db:
+            if incremental:
+                storage.save_incremental(
+                    filtered, 'daily_data',
+                    conflict_columns=('code', 'date'),
+                    batch_size=config.db_batch_size
+                )
+            else:
+                storage.save_to_database(filtered, 'daily_data', batch_size=config.db_batch_size)
+        total += len(filtered)
+
+    return total
+
+
 def sync_all_min_data(
     reader: TdxDataReader,
     processor: DataProcessor,
@@ -197,11 +318,21 @@ def sync_all_min_data(
         nodata = 0
         failed = 0
 
+        # 跨股票攒批：单股票的 4 帧都很小，逐股开事务的固定开销远大于
+        # 实际插入成本，攒到行数阈值再一次事务写完
+        write_buffer: list = []
+
+        def _flush():
+            if write_buffer:
+                storage.save_incremental_many(write_buffer)
+                write_buffer.clear()
+
         for _, stock in iterator:
             code = stock['code']
             market = 1 if code.startswith('sh') else 0
             try:
-                if sync_single_stock_min_data(reader, processor, storage, market, code, start_date):
+                if sync_single_stock_min_data(reader, processor, storage, market, code,
+                                              start_date, write_buffer=write_buffer):
                     synced += 1
                 else:
                     nodata += 1
@@ -212,6 +343,10 @@ def sync_all_min_data(
                 failed += 1
                 logger.error(f"处理 {code} 分钟数据时出错: {e}")
                 continue
+            if sum(len(df) for df, _, _ in write_buffer) >= _MIN_WRITE_FLUSH_ROWS:
+                _flush()
+
+        _flush()
 
         logger.info(f"分钟数据同步完成：{synced} 只已处理，{nodata} 只无数据"
                     + (f"，{failed} 只失败" if failed else ""))
@@ -225,12 +360,10 @@ def sync_all_min_data(
         logger.error(f"处理分钟数据时出错: {e}")
         return False
 
-def parse_args() -> Namespace:
-    """解析命令行参数
-
-    Returns:
-        Namespace: 解析后的命令行参数
-    """
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """构建命令行解析器（进程内只构建一次，重复 parse_args 不再重付
+    几十次 add_argument 的构建成本）"""
     parser = argparse.ArgumentParser(
         description='通达信数据处理工具',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -300,7 +433,16 @@ def parse_args() -> Namespace:
     status_parser = subparsers.add_parser('status', help='数据库状态一览：每表行数/覆盖股票数/日期范围（只读）')
     status_parser.add_argument('--json', action='store_true', help='输出机器可读 JSON')
 
-    return parser.parse_args()
+    return parser
+
+
+def parse_args() -> Namespace:
+    """解析命令行参数
+
+    Returns:
+        Namespace: 解析后的命令行参数
+    """
+    return _build_parser().parse_args()
 
 def update_config(args: Namespace) -> None:
     """根据命令行参数更新配置
@@ -351,10 +493,10 @@ def sync_blocks(storage: DataStorage, to_csv: bool = False, to_db: bool = True)
     return (not to_db) or db_success
 
 
-def _init_storage(create_tables: bool = True) -> Optional[DataStorage]:
+def _init_storage(create_tables: bool = True, use_db: bool = True) -> Optional[DataStorage]:
     """初始化 DataStorage，失败时打印指引并返回 None"""
     try:
-        return DataStorage(create_tables=create_tables)
+        return DataStorage(create_tables=create_tables, use_db=use_db)
     except ValueError as e:
         logger.error(f"数据库配置错误: {e}")
         return None
@@ -425,6 +567,19 @@ def main() -> int:
             return 1
         return run_status(storage, as_json=args.json)
 
+    # 初始化数据存储器（先于读取器：DB 配置错误最常见，失败时不再白付
+    # 读取器的路径探测成本）。仅 CSV 输出的命令完全跳过数据库引擎创建——
+    # minutes 的增量路径只写库，不在豁免之列；daily --auto-start 要查库
+    # 定起始日期（单股票路径），同样保留引擎
+    csv_only_db_free = (
+        getattr(args, 'csv_only', False)
+        and args.command in ('stock-list', 'daily', 'blocks')
+        and not (args.command == 'daily' and getattr(args, 'auto_start', False))
+    )
+    storage = _init_storage(use_db=not csv_only_db_free)
+    if storage is None:
+        return 1
+
     # 初始化数据读取器
     try:
         reader = TdxDataReader()
@@ -432,11 +587,6 @@ def main() -> int:
         logger.error(f"初始化失败: {e}")
         return 1
 
-    # 初始化数据存储器
-    storage = _init_storage()
-    if storage is None:
-        return 1
-
     # 处理子命令
     if args.command == 'stock-list':
         # 获取股票列表
@@ -450,6 +600,7 @@ def main() -> int:
 
             # 保存数据
             storage.save_stock_info(stocks, to_csv=to_csv, to_db=to_db, batch_size=config.db_batch_size)
+            storage.flush_csv()  # 异步写盘失败在此浮出，保证退出码非零
 
         except Exception as e:
             logger.error(f"获取股票列表时出错: {e}")
@@ -483,14 +634,29 @@ def main() -> int:
                 else:
                     logger.info(f"数据库中没有 {args.code} 的数据，将获取全部历史")
 
-            # 获取日线数据
-            if args.code:
-                # 获取单只股票的日线数据（market 未指定时从 code 推断）
-                market = args.market if args.market is not None else infer_market(args.code)
-                data = reader.read_daily_data(market, args.code)
-            else:
-                # 获取所有股票的日线数据
-                data = reader.read_all_daily_data()
+            processor = DataProcessor()
+            # 确定保存方式
+            to_csv = not args.db_only
+            to_db = not args.csv_only
+            incremental = hasattr(args, 'incremental') and args.incremental
+
+            if not args.code:
+                # 全市场：流式逐股票处理，不再把所有股票的日线物化成一个 DataFrame
+                total = stream_all_daily_data(
+                    reader, processor, storage,
+                    start_date=start_date, end_date=args.end_date,
+                    to_csv=to_csv, to_db=to_db, incremental=incremental,
+                )
+                storage.flush_csv()  # 逐股票追加的异步写盘失败在此浮出
+                if total == 0:
+                    logger.warning("筛选后没有数据")
+                else:
+                    logger.info(f"日线数据处理完成，共写出 {total} 条记录")
+                return 0
+
+            # 获取单只股票的日线数据（market 未指定时从 code 推断）
+            market = args.market if args.market is not None else infer_market(args.code)
+            data = reader.read_daily_data(market, args.code)
 
             if data.empty:
                 logger.warning("未获取到任何数据")
@@ -499,7 +665,6 @@ def main() -> int:
             logger.info(f"获取到 {len(data)} 条日线数据记录")
 
             # 处理数据
-            processor = DataProcessor()
             processed_data = processor.process_daily_data(data)
 
             # 根据日期筛选
@@ -516,11 +681,6 @@ def main() -> int:
 
             logger.info(f"筛选后有 {len(filtered_data)} 条日线数据记录")
 
-            # 确定保存方式
-            to_csv = not args.db_only
-            to_db = not args.csv_only
-            incremental = hasattr(args, 'incremental') and args.incremental
-
             # 保存数据
             if to_csv:
                 storage.save_to_csv(filtered_data, 'daily_data')
@@ -533,6 +693,7 @@ def main() -> int:
                     )
                 else:
                     storage.save_to_database(filtered_data, 'daily_data', batch_size=config.db_batch_size)
+            storage.flush_csv()
 
         except Exception as e:
             logger.error(f"获取日线数据时出错: {e}")
@@ -590,6 +751,7 @@ def main() -> int:
                 to_csv=not args.db_only,
                 to_db=not args.csv_only,
             )
+            storage.flush_csv()
             return 0 if success else 1
         except Exception as e:
             logger.error(f"同步板块关系时出错: {e}")
@@ -75,6 +75,13 @@ class Config:
         self.db_password = os.getenv('DB_PASSWORD', '')
         self.db_batch_size = int(os.getenv('DB_BATCH_SIZE', '10000'))
 
+        # 同步时读取+处理阶段的并行线程数（写库始终在主线程串行）。
+        # 设 1 恢复完全串行
+        self.sync_workers = max(1, int(os.getenv('SYNC_WORKERS', '4')))
+
+        # 文件输出格式：csv / parquet / both（parquet 需要 pyarrow，extras: speed）
+        self.output_format = os.getenv('OUTPUT_FORMAT', 'csv').lower()
+
         # 是否使用进度条
         self.use_tqdm = os.getenv('USE_TQDM', 'True').lower() == 'true'
 
@@ -8,46 +8,104 @@
 - OHLCV 重采样
 """
 
+from types import MappingProxyType
 from typing import Optional, List
+
+import numpy as np
 import pandas as pd
 
 from .logger import logger
 
-# 重采样聚合规则
-RESAMPLE_AGG = {
+# polars 为可选加速依赖（extras: speed）：均线热路径用其多线程 Rust 实现，
+# 未安装时回退纯 numpy 单线程实现，结果一致
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# numba 同为可选加速依赖：polars 缺席时把多窗口滑动求和 JIT 成单遍
+# 增量加减核（按股票 prange 并行），cache=True 把编译成本摊到首次运行
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# 重采样聚合规则（仅数值列：code/market 对单股票是常量，重采样后整列
+# 广播赋回即可，省掉 object 列的逐组 first 归约）。对外暴露
+# MappingProxyType 只读视图；内部私有 dict 直接传 groupby.agg
+# （pandas 的 agg 规范化会按 type(spec)() 重建，不接受 mappingproxy）
+_RESAMPLE_AGG = {
     'open': 'first',
     'high': 'max',
     'low': 'min',
     'close': 'last',
     'volume': 'sum',
     'amount': 'sum',
-    'code': 'first',
-    'market': 'first',
 }
+RESAMPLE_AGG = MappingProxyType(_RESAMPLE_AGG)
 
 # 均线周期
 MA_WINDOWS = [5, 10, 13, 21, 34, 55, 60, 89, 144, 233, 250]
 
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _ma_kernel(close, starts, lengths, windows, out):
+        """对每段连续的单股票切片，一遍增量加减同时算出全部窗口的均线。
+        out 预填 NaN，窗口不足的行保持 NaN。"""
+        for g in prange(len(starts)):
+            s = starts[g]
+            n = lengths[g]
+            for j in range(len(windows)):
+                w = windows[j]
+                acc = 0.0
+                for i in range(n):
+                    acc += close[s + i]
+                    if i >= w:
+                        acc -= close[s + i - w]
+                    if i >= w - 1:
+                        out[s + i, j] = acc / w
+else:
+    _ma_kernel = None
+
 
 class DataProcessor:
     """数据处理类"""
 
     @staticmethod
-    def resample_ohlcv(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    def resample_ohlcv(df: pd.DataFrame, freq: str, on: str = 'datetime') -> pd.DataFrame:
         """将 OHLCV 数据重采样到目标频率
 
         Args:
-            df: 带有 DatetimeIndex 的 DataFrame
+            df: 带 datetime 列的 DataFrame（无需设索引，resample 直接
+                按 on= 列分 bin，省去 set_index/reset_index 的整帧重建）
             freq: pandas resample 频率字符串（'15min', '30min', '60min'）
+            on: 时间列名，默认 'datetime'
 
         Returns:
-            重采样后的 DataFrame（已 reset_index）
+            重采样后的 DataFrame（datetime 为列）
         """
-        agg = dict(RESAMPLE_AGG)
-        if 'date' in df.columns:
-            agg['date'] = 'first'
-        result = df.resample(freq).agg(agg).dropna()
+        # 只对纯数值 OHLCV 列做 group 归约（走 pandas 数值快路径），
+        # 单股票恒定的 code/market 事后整列广播；date 由 bin 起点重算
+        # （日内 bin 不跨日，与原先逐组取 first 等价）。
+        # 分 bin 不走 resample 的日历机制：datetime64 按 i8 视图整除
+        # bin 宽度即得桶号（一次 numpy 除法），groupby int64 吃 hash
+        # 聚合快路径，且只产出非空 bin。15/30/60min 均整除一天，桶边界
+        # 与 resample 默认的 origin='start_day' 逐一重合。
+        # agg(dict) 只触碰字典里的列，无需先做列子集拷贝
+        freq_ns = pd.Timedelta(freq).value
+        bins = df[on].to_numpy().view('i8') // freq_ns
+        result = df.groupby(bins, sort=True).agg(_RESAMPLE_AGG).dropna()
+        result.index = pd.DatetimeIndex(
+            (result.index.to_numpy() * freq_ns).view('M8[ns]'), name=on
+        )
         result.reset_index(inplace=True)
+        if 'date' in df.columns:
+            # normalize 产出 datetime64 当日零点（不生成逐行 date 对象），
+            # 也让 date 列过滤能走 searchsorted 快路径
+            result['date'] = result[on].dt.normalize()
+        for col in ('code', 'market'):
+            if col in df.columns and len(df):
+                result[col] = df[col].iloc[0]
         return result
 
     @staticmethod
@@ -92,18 +150,96 @@ class DataProcessor:
     def _calculate_ma(df: pd.DataFrame) -> pd.DataFrame:
         """计算均线指标，按股票分组
 
+        单次遍历实现：按 code 稳定排序得到每只股票的连续切片，对 close
+        做一次 cumsum，再用差分同时得出全部 11 个窗口的均线。相比原来
+        11 次 ``groupby().transform(lambda ...)``，少扫描 close 列 10 遍，
+        也消除了每组一次的 Python 回调开销（校验后 close 无 NaN，
+        cumsum 差分与 rolling(w).mean() 等价）。
+
         Args:
             df: 包含 'close' 和 'code' 列的 DataFrame
 
         Returns:
             添加了均线列的 DataFrame
         """
-        for w in MA_WINDOWS:
-            df[f'ma{w}'] = df.groupby('code')['close'].transform(
-                lambda x: x.rolling(window=w).mean()
-            )
+        close = df['close'].to_numpy(dtype='float64')
+        n = len(close)
+        codes = pd.factorize(df['code'])[0]
+
+        if pl is not None:
+            # polars 窗口函数多线程并行且不持 GIL；over() 保持原行序。
+            # 用 factorize 后的整型分组键构造，避免字符串列和 pyarrow 依赖
+            exprs = [
+                pl.col('close').rolling_mean(w).over('g').alias(f'ma{w}')
+                for w in MA_WINDOWS
+            ]
+            mas = pl.DataFrame({'g': codes, 'close': close}).select(exprs)
+            df[[f'ma{w}' for w in MA_WINDOWS]] = mas.to_numpy()
+            return df
+
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+
+        # 排序后每只股票是一段连续切片；pos_in_group 为行在本股票内的序号
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        lengths = np.diff(np.r_[starts, n])
+        out = np.full((n, len(MA_WINDOWS)), np.nan)
+        if _ma_kernel is not None:
+            _ma_kernel(close[order], starts, lengths,
+                       np.asarray(MA_WINDOWS, dtype=np.int64), out)
+        else:
+            pos_in_group = np.arange(n) - np.repeat(starts, lengths)
+            csum = np.concatenate(([0.0], np.cumsum(close[order])))
+            for j, w in enumerate(MA_WINDOWS):
+                # 窗口不足 w 的行保持 NaN，与 rolling(window=w) 默认行为一致
+                idx = np.flatnonzero(pos_in_group >= w - 1)
+                out[idx, j] = (csum[idx + 1] - csum[idx + 1 - w]) / w
+
+        restored = np.empty_like(out)
+        restored[order] = out
+        df[[f'ma{w}' for w in MA_WINDOWS]] = restored
         return df
 
+    @staticmethod
+    def _fill_validate_ma(processed_df: pd.DataFrame) -> pd.DataFrame:
+        """缺失值填充 + 质量校验 + 均线计算的公共尾段
+
+        process_daily_data 与 process_min_data 原先各自复制这一段；
+        收拢后均线实现（numpy/polars）只需维护一份，预热成本也只付一次。
+
+        Args:
+            processed_df: 已就绪 datetime 列的 OHLCV DataFrame
+
+        Returns:
+            处理后的 DataFrame
+        """
+        # 价格列降为 float32：TDX 源数据本就是 0.01 元整数刻度，float32 的
+        # 相对误差（~6e-8）远小于最小报价单位，均线热路径的内存带宽减半。
+        # volume/amount 量级可达 1e10，超出 float32 尾数精度，保持 float64
+        for col in ('open', 'high', 'low', 'close'):
+            if col in processed_df.columns:
+                processed_df[col] = processed_df[col].astype('float32', copy=False)
+
+        # 处理缺失值：用前一个有效值填充。整块一次 ffill 替代逐列循环
+        # （六次方法分派 + 六遍缺失掩码 → 一次）；多股票帧按 code 分组，
+        # 避免上一只股票的收尾价格填进下一只股票的开头
+        numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'amount']
+        present = [col for col in numeric_columns if col in processed_df.columns]
+        if present:
+            if 'code' in processed_df.columns and processed_df['code'].nunique() > 1:
+                processed_df[present] = processed_df.groupby('code', sort=False)[present].ffill()
+            else:
+                processed_df[present] = processed_df[present].ffill()
+
+        # 数据质量校验
+        processed_df = DataProcessor._validate_ohlcv(processed_df)
+
+        # 计算均线指标
+        if all(col in processed_df.columns for col in ['close', 'volume']):
+            processed_df = DataProcessor._calculate_ma(processed_df)
+
+        return processed_df
+
     @staticmethod
     def process_daily_data(df: pd.DataFrame) -> pd.DataFrame:
         """处理日线数据
@@ -117,8 +253,9 @@ class DataProcessor:
         if df.empty:
             return df
 
-        # 复制数据，避免修改原始数据
-        processed_df = df.copy()
+        # 浅拷贝即可：后续只做整列赋值/筛选，不触碰原始数据的底层数组，
+        # 避免深拷贝把处理管道的峰值内存翻倍
+        processed_df = df.copy(deep=False)
 
         # 确保datetime列存在
         if 'datetime' not in processed_df.columns:
@@ -126,26 +263,12 @@ class DataProcessor:
             if processed_df.index.name == 'datetime' or isinstance(processed_df.index, pd.DatetimeIndex):
                 # 如果索引是日期时间类型，直接将索引转为列
                 processed_df['datetime'] = processed_df.index
-            # 如果索引不是日期时间类型但包含日期信息（如终端输出所示）
-            elif hasattr(processed_df.iloc[-1], 'name') and isinstance(processed_df.iloc[-1].name, pd.Timestamp):
-                # 从行索引名称中提取日期时间
-                processed_df['datetime'] = processed_df.apply(lambda row: row.name if isinstance(row.name, pd.Timestamp) else None, axis=1)
+            # 索引不是 DatetimeIndex 但值是 Timestamp（object 索引）：整列一次转换，
+            # 替代原先逐行 apply(axis=1) 的 O(N) Python 回调
+            elif len(processed_df) and isinstance(processed_df.index[-1], pd.Timestamp):
+                processed_df['datetime'] = pd.to_datetime(processed_df.index, errors='coerce')
 
-        # 处理缺失值
-        numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'amount']
-        for col in numeric_columns:
-            if col in processed_df.columns:
-                # 用前一个有效值填充缺失值
-                processed_df[col] = processed_df[col].ffill()
-
-        # 数据质量校验
-        processed_df = DataProcessor._validate_ohlcv(processed_df)
-
-        # 计算均线指标
-        if all(col in processed_df.columns for col in ['close', 'volume']):
-            processed_df = DataProcessor._calculate_ma(processed_df)
-
-        return processed_df
+        return DataProcessor._fill_validate_ma(processed_df)
 
     @staticmethod
     def process_min_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -160,51 +283,47 @@ class DataProcessor:
         if df.empty:
             return df
 
-        # 复制数据，避免修改原始数据
-        processed_df = df.copy()
-
-
-        # 重命名列，使其更符合通用命名
-        column_mapping = {
-            'amount': 'amount',  # 成交额
-            'close': 'close',    # 收盘价
-            'open': 'open',      # 开盘价
-            'high': 'high',      # 最高价
-            'low': 'low',        # 最低价
-            'vol': 'volume',     # 成交量
-            'year': 'year',      # 年
-            'month': 'month',    # 月
-            'day': 'day',        # 日
-            'hour': 'hour',      # 时
-            'minute': 'minute',  # 分
-            'datetime': 'datetime',  # 日期时间
-            'code': 'code',      # 股票代码
-            'market': 'market'   # 市场代码
-        }
-        processed_df.rename(columns={k: v for k, v in column_mapping.items() if k in processed_df.columns}, inplace=True)
+        # 浅拷贝即可，理由同 process_daily_data
+        processed_df = df.copy(deep=False)
 
-        # 确保datetime列存在
+        # 重命名列，使其更符合通用命名（唯一的实际改名是 vol → volume，
+        # 旧映射表里其余都是恒等项，白白走一遍列轴重建）
+        if 'vol' in processed_df.columns:
+            processed_df.rename(columns={'vol': 'volume'}, inplace=True)
+
+        # 确保datetime列存在：直接从数值分量列组装（pandas 原生向量化路径），
+        # 替代原先逐行 astype(str) + agg(join) 拼字符串再解析的 O(N) Python 开销
         if 'datetime' not in processed_df.columns and all(col in processed_df.columns for col in ['year', 'month', 'day', 'hour', 'minute']):
             processed_df['datetime'] = pd.to_datetime(
-                processed_df[['year', 'month', 'day']].astype(str).agg('-'.join, axis=1) + ' ' +
-                processed_df[['hour', 'minute']].astype(str).agg(':'.join, axis=1)
+                processed_df[['year', 'month', 'day', 'hour', 'minute']]
             )
 
-        # 处理缺失值
-        numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'amount']
-        for col in numeric_columns:
-            if col in processed_df.columns:
-                # 用前一个有效值填充缺失值
-                processed_df[col] = processed_df[col].ffill()
+        return DataProcessor._fill_validate_ma(processed_df)
 
-        # 数据质量校验
-        processed_df = DataProcessor._validate_ohlcv(processed_df)
-
-        # 计算均线指标
-        if all(col in processed_df.columns for col in ['close', 'volume']):
-            processed_df = DataProcessor._calculate_ma(processed_df)
+    @staticmethod
+    def _filter_date_range(
+        df: pd.DataFrame,
+        col: str,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+    ) -> pd.DataFrame:
+        """按单列日期范围筛选
 
-        return processed_df
+        列已按时间升序时（流式管道的单股票帧天然有序）用 searchsorted
+        做 O(log N) 定位 + 一次切片，省掉整列布尔掩码和两个中间帧；
+        乱序帧回退布尔掩码，行为不变。
+        """
+        s = df[col]
+        if pd.api.types.is_datetime64_any_dtype(s) and s.is_monotonic_increasing:
+            values = s.to_numpy()
+            lo = values.searchsorted(start_ts.to_datetime64(), side='left') if start_ts is not None else 0
+            hi = values.searchsorted(end_ts.to_datetime64(), side='right') if end_ts is not None else len(df)
+            return df.iloc[lo:hi]
+        if start_ts is not None:
+            df = df[df[col] >= start_ts]
+        if end_ts is not None:
+            df = df[df[col] <= end_ts]
+        return df
 
     @staticmethod
     def filter_data(
@@ -227,27 +346,31 @@ class DataProcessor:
         if df.empty:
             return df
 
-        filtered_df = df.copy()
+        # 布尔筛选本身返回新对象，无需先整体复制
+        filtered_df = df
+
+        # 懒格式化：INFO 级别下每股票 ×4 表的调用不再付字符串拼接成本
+        logger.debug("筛选日期范围: start_date=%s, end_date=%s", start_date, end_date)
 
+        # 日期字符串只解析一次（date/datetime 两列最多用到 4 次）
+        start_ts = pd.to_datetime(start_date) if start_date else None
+        end_ts = pd.to_datetime(end_date) if end_date else None
 
-        logger.debug(f"筛选日期范围: start_date={start_date}, end_date={end_date}")
         # 按日期筛选
-        if 'date' in filtered_df.columns:
-            if start_date:
-                filtered_df = filtered_df[filtered_df['date'] >= pd.to_datetime(start_date)]
-            if end_date:
-                filtered_df = filtered_df[filtered_df['date'] <= pd.to_datetime(end_date)]
+        if 'date' in filtered_df.columns and (start_ts is not None or end_ts is not None):
+            filtered_df = DataProcessor._filter_date_range(filtered_df, 'date', start_ts, end_ts)
 
         # 按时间筛选
-        if 'datetime' in filtered_df.columns:
-            if start_date:
-                filtered_df = filtered_df[filtered_df['datetime'] >= pd.to_datetime(start_date)]
-            if end_date:
-                filtered_df = filtered_df[filtered_df['datetime'] <= pd.to_datetime(end_date)]
+        if 'datetime' in filtered_df.columns and (start_ts is not None or end_ts is not None):
+            filtered_df = DataProcessor._filter_date_range(filtered_df, 'datetime', start_ts, end_ts)
 
-        # 按股票代码筛选
+        # 按股票代码筛选：单 code（CLI --code 的常态）走标量等值比较，
+        # 多 code 先转 set 去重再哈希匹配
         if codes and 'code' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['code'].isin(codes)]
+            if len(codes) == 1:
+                filtered_df = filtered_df[filtered_df['code'] == codes[0]]
+            else:
+                filtered_df = filtered_df[filtered_df['code'].isin(set(codes))]
 
         return filtered_df
 
@@ -272,17 +395,22 @@ class DataProcessor:
         if df.empty:
             return df
 
-        filtered_df = df.copy()
+        # 布尔筛选本身返回新对象，无需先整体复制
+        filtered_df = df
+
+        # 日期字符串只解析一次
+        start_ts = pd.to_datetime(start_date) if start_date else None
+        end_ts = pd.to_datetime(end_date) if end_date else None
 
         # 按日期筛选
-        if 'date' in filtered_df.columns:
-            if start_date:
-                filtered_df = filtered_df[filtered_df['datetime'] >= pd.to_datetime(start_date)]
-            if end_date:
-                filtered_df = filtered_df[filtered_df['datetime'] <= pd.to_datetime(end_date)]
+        if 'date' in filtered_df.columns and (start_ts is not None or end_ts is not None):
+            filtered_df = DataProcessor._filter_date_range(filtered_df, 'datetime', start_ts, end_ts)
 
-        # 按股票代码筛选
+        # 按股票代码筛选（同 filter_data：单 code 等值、多 code set）
         if codes and 'code' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['code'].isin(codes)]
+            if len(codes) == 1:
+                filtered_df = filtered_df[filtered_df['code'] == codes[0]]
+            else:
+                filtered_df = filtered_df[filtered_df['code'].isin(set(codes))]
 
         return filtered_df
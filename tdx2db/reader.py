@@ -7,10 +7,11 @@
 """
 
 import os
-import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, List
 
+import numpy as np
 import pandas as pd
 from pytdx.reader import TdxDailyBarReader, TdxMinBarReader, TdxLCMinBarReader
 from tqdm import tqdm
@@ -19,6 +20,59 @@ from .config import config, default_tdx_candidates, detect_tdx_path
 from .logger import logger
 from .processor import DataProcessor
 
+# A 股代码筛选：前 3 位整数分桶（整数比较 + frozenset 哈希，比正则 NFA
+# 快一个数量级；isdigit 先排除非纯数字文件名）
+# 深证A股：主板 000/001/002 + 创业板 300/301
+_SZ_A_PREFIXES = frozenset({0, 1, 2, 300, 301})
+# 上证A股：主板 60xxxx（前缀 600~609）+ 科创板 688xxx
+# （等价于旧正则 ^(60\d{4}|688\d{3})$，含 2026-06 科创板 7 位笔误的修复）
+_SH_A_PREFIXES = frozenset(range(600, 610)) | {688}
+
+
+# .day 记录布局（32 字节，小端）：日期 YYYYMMDD 整型 + OHLC（×100 整型）
+# + 成交额 float + 成交量 + 保留位
+_DAY_DTYPE = np.dtype([
+    ('date', '<u4'), ('open', '<u4'), ('high', '<u4'), ('low', '<u4'),
+    ('close', '<u4'), ('amount', '<f4'), ('volume', '<u4'), ('_r', '<u4'),
+])
+
+# .lc5 记录布局（32 字节，小端）：date 编码 year=num//2048+2004,
+# month=(num%2048)//100, day=(num%2048)%100；time 为 0 点起分钟数
+_LC5_DTYPE = np.dtype([
+    ('date', '<u2'), ('time', '<u2'), ('open', '<f4'), ('high', '<f4'),
+    ('low', '<f4'), ('close', '<f4'), ('amount', '<f4'), ('volume', '<u4'),
+    ('_r', '<u4'),
+])
+
+
+# datetime 列的期望 dtype：单次 != 比较即可判定，比 is_datetime64_any_dtype
+# 的类型分派便宜，更避免每次调用都整列重转换
+_DT64_NS = np.dtype('datetime64[ns]')
+
+
+def _ensure_datetime(col: pd.Series) -> pd.Series:
+    """datetime 列兜底转换：已是 datetime64 原样返回；整数 dtype 视为
+    epoch 毫秒直接 astype（免走 pd.to_datetime 的逐值解析路径，快一个
+    数量级以上）；其余（字符串等）仍走通用解析。"""
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    if col.dtype.kind in 'iu':
+        return pd.Series(col.to_numpy().astype('datetime64[ms]'), index=col.index, name=col.name)
+    return pd.to_datetime(col)
+
+
+def _scan_day_codes(path: Path) -> List[str]:
+    """列出 lday 目录下所有 .day 文件的主干名
+
+    os.scandir 单次 getdents 即拿到文件名，不像 glob 那样逐项构造
+    Path 对象；目录不存在时返回空列表。
+    """
+    if not path.exists():
+        return []
+    with os.scandir(path) as it:
+        return [e.name[:-4] for e in it if e.name.endswith('.day')]
+
+
 class TdxDataReader:
     """通达信数据读取类"""
 
@@ -52,6 +106,28 @@ class TdxDataReader:
         self.min_reader = TdxMinBarReader()
         self.lc_min_reader = TdxLCMinBarReader()
 
+        # get_stock_list 结果缓存：(lday 目录 mtime, DataFrame)。
+        # daily 与 minutes 同步各调一次，目录不变时免去重复扫描 6k+ 文件
+        self._stock_list_cache = None
+
+        # 目录文件名集合缓存：逐股票的存在性判断查内存集合，替代每文件
+        # 一次 stat。每目录只扫一次（CLI 进程短生命周期，同步过程中盘面
+        # 不会新增代码文件；新开 reader 自然重建）
+        self._dir_names_cache: dict = {}
+
+    def _has_file(self, data_path: Path, fname: str) -> bool:
+        """判断 data_path 下是否存在 fname：首次访问 scandir 建集合，
+        之后纯内存查询（目录不存在视为无文件）"""
+        names = self._dir_names_cache.get(data_path)
+        if names is None:
+            try:
+                with os.scandir(data_path) as it:
+                    names = frozenset(e.name for e in it)
+            except OSError:
+                names = frozenset()
+            self._dir_names_cache[data_path] = names
+        return fname in names
+
     def _load_real_names(self) -> dict:
         """读取真实股票名称：T0002/hq_cache/infoharbor_ex.code（issue #42）
 
@@ -137,42 +213,51 @@ class TdxDataReader:
         if not (sz_path.exists() or sh_path.exists()):
             raise FileNotFoundError(f"无法找到股票列表文件或股票数据目录")
 
+        # 目录 mtime 未变则直接返回缓存（copy 防调用方原地修改污染缓存）
+        mtime = max(p.stat().st_mtime for p in (sz_path, sh_path) if p.exists())
+        if self._stock_list_cache is not None and self._stock_list_cache[0] == mtime:
+            return self._stock_list_cache[1].copy()
+
         real_names = self._load_real_names()
         capital = self._load_capital_info()
         _empty_cap = {'zgb': None, 'ltag': None, 'capital_date': None, 'list_date': None}
 
-        # 从目录中获取股票代码
-        stocks = []
+        # 从目录中获取股票代码（scandir 批量拿文件名后统一过滤）。
+        # 按列累积（SoA）而非每股一个 dict：DataFrame 由现成的列表直接
+        # 成列，省去 list-of-dicts 的逐行 hash 转置
+        codes: List[str] = []
+        names: List[str] = []
+        caps: List[dict] = []
 
         # 处理深圳股票
-        if sz_path.exists():
-            for file in sz_path.glob('*.day'):
-                code = file.stem
-                pure_code = code[-6:]
-                code_str = str(pure_code).zfill(6)  # 补齐为6位字符串
-                name = real_names.get(code_str, f"深A{code}")
-                # 深证A股：主板 000/001/002 + 创业板 300/301
-                if re.match(r'^(000|001|002|300|301)\d{3}$', code_str):
-                    stocks.append({'code': code, 'name': name, **capital.get(code_str, _empty_cap)})
+        for code in _scan_day_codes(sz_path):
+            code_str = code[-6:].zfill(6)  # 补齐为6位字符串
+            if code_str.isdigit() and int(code_str[:3]) in _SZ_A_PREFIXES:
+                codes.append(code)
+                names.append(real_names.get(code_str, f"深A{code}"))
+                caps.append(capital.get(code_str, _empty_cap))
 
         # 处理上海股票
-        if sh_path.exists():
-            for file in sh_path.glob('*.day'):
-                code = file.stem
-                pure_code = code[-6:]
-                code_str = str(pure_code).zfill(6)  # 补齐为6位字符串
-                name = real_names.get(code_str, f"上A{code}")
-                # 上证A股：主板 60xxxx + 科创板 688xxx（旧正则 688\d{4} 共 7 位，永远匹配不上 6 位代码）
-                if re.match(r'^(60\d{4}|688\d{3})$', code_str):
-                    stocks.append({'code': code, 'name': name, **capital.get(code_str, _empty_cap)})
-
-        if not stocks:
+        for code in _scan_day_codes(sh_path):
+            code_str = code[-6:].zfill(6)  # 补齐为6位字符串
+            if code_str.isdigit() and int(code_str[:3]) in _SH_A_PREFIXES:
+                codes.append(code)
+                names.append(real_names.get(code_str, f"上A{code}"))
+                caps.append(capital.get(code_str, _empty_cap))
+
+        if not codes:
             raise FileNotFoundError(f"未找到任何股票数据文件")
 
-        return pd.DataFrame(
-            stocks,
-            columns=['code', 'name', 'zgb', 'ltag', 'capital_date', 'list_date'],
-        )
+        result = pd.DataFrame({
+            'code': codes,
+            'name': names,
+            'zgb': [c['zgb'] for c in caps],
+            'ltag': [c['ltag'] for c in caps],
+            'capital_date': [c['capital_date'] for c in caps],
+            'list_date': [c['list_date'] for c in caps],
+        }, copy=False)
+        self._stock_list_cache = (mtime, result)
+        return result.copy()
 
     def read_daily_data(self, market: int, code: str) -> pd.DataFrame:
         """读取日线数据
@@ -192,88 +277,144 @@ class TdxDataReader:
             code = code[-6:]
         file_path = data_path / f"{market_folder}{code}.day"
 
-        if not file_path.exists():
+        if not self._has_file(data_path, file_path.name):
             raise FileNotFoundError(f"日线数据文件不存在: {file_path}")
 
-        # pytdx get_security_type 不识别科创板 688（code_head '68' 不在任何分支），
-        # get_df 会 print 噪音 + raise NotImplementedError，需先检查再决定走原始解析
-        sec_type = self.daily_reader.get_security_type(str(file_path))
-        if sec_type in self.daily_reader.SECURITY_TYPE:
-            data = self.daily_reader.get_df(str(file_path))
-        else:
-            data = self._read_day_file_raw(str(file_path))
-        data['code'] = code
+        # 统一走自研向量化解析：A 股系数（价×0.01、量×0.01）与 pytdx
+        # SZ/SH_A_STOCK 路径一致，且天然覆盖 pytdx 不识别的科创板 688
+        # （其 get_security_type 对 code_head '68' 会 print 噪音 + raise）
+        data = self._read_day_file_raw(str(file_path))
+        # code 用单类目 categorical 广播：整列只存 int8 码 + 一个字符串，
+        # 比逐行 object 指针省一个数量级内存，全量合并时尤其明显
+        data['code'] = pd.Categorical.from_codes(
+            np.zeros(len(data), dtype=np.int8), categories=[code]
+        )
         data['market'] = market
         return data
 
     @staticmethod
-    def _read_day_file_raw(fname: str) -> pd.DataFrame:
-        """直接解析 .day 文件，绕过 pytdx 的证券类型检查（用于科创板 688 等）。
-        系数与 pytdx SH_A_STOCK 路径一致：价格 ×0.01，volume ×0.01，amount 原样。"""
-        import struct
-        rows = []
+    def _read_file_bytes(fname: str) -> bytes:
+        """一次 read 整读数据文件，Linux 上先发 posix_fadvise(WILLNEED)
+        预读提示让内核提前调度磁盘 I/O。每文件固定两个 syscall
+        （open+read），非 Linux / 不支持的文件系统静默跳过提示。"""
         with open(fname, 'rb') as f:
-            content = f.read()
-        record_size = struct.calcsize('<IIIIIfII')
-        for i in range(0, len(content) - record_size + 1, record_size):
-            row = struct.unpack_from('<IIIIIfII', content, i)
-            t = str(row[0])
-            date_str = f"{t[:4]}-{t[4:6]}-{t[6:]}"
-            rows.append((date_str,
-                         row[1] * 0.01, row[2] * 0.01, row[3] * 0.01, row[4] * 0.01,
-                         row[5], row[6] * 0.01))
-        df = pd.DataFrame(rows, columns=['date', 'open', 'high', 'low', 'close', 'amount', 'volume'])
-        df.index = pd.to_datetime(df['date'])
-        df.index.name = 'date'
-        return df[['open', 'high', 'low', 'close', 'amount', 'volume']]
+            if hasattr(os, 'posix_fadvise'):
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                except OSError:
+                    pass
+            return f.read()
 
-    def read_min_data(self, market: int, code: str) -> List[pd.DataFrame]:
-        """读取5分钟线数据并生成15分钟、30分钟和60分数据
+    @staticmethod
+    def _read_day_file_raw(fname: str) -> pd.DataFrame:
+        """向量化解析 .day 文件：np.frombuffer 一次 C 调用按 _DAY_DTYPE 视图
+        整个文件，替代 pytdx 的逐记录 struct.unpack（解释器开销随记录数线性）。
+        系数与 pytdx SZ/SH_A_STOCK 路径一致：价格 ×0.01，volume ×0.01，amount 原样。"""
+        content = TdxDataReader._read_file_bytes(fname)
+        n = len(content) // _DAY_DTYPE.itemsize
+        arr = np.frombuffer(content, dtype=_DAY_DTYPE, count=n)
+        date = arr['date'].astype(np.int64)
+        df = pd.DataFrame({
+            'open': arr['open'] * 0.01,
+            'high': arr['high'] * 0.01,
+            'low': arr['low'] * 0.01,
+            'close': arr['close'] * 0.01,
+            'amount': arr['amount'].astype(np.float64),
+            'volume': arr['volume'] * 0.01,
+        })
+        df.index = pd.DatetimeIndex(pd.to_datetime(pd.DataFrame({
+            'year': date // 10000,
+            'month': date // 100 % 100,
+            'day': date % 100,
+        })), name='date')
+        return df
 
-        Args:
-            market: 市场代码，0表示深圳，1表示上海
-            code: 股票代码
+    @staticmethod
+    def _read_lc5_fast(fname: str) -> pd.DataFrame:
+        """向量化解析 .lc5 文件（路径与 .day 同理）：frombuffer 按 _LC5_DTYPE
+        取列，日期/分钟字段整列算术解码后组装 datetime 列。.lc5 无系数换算。"""
+        content = TdxDataReader._read_file_bytes(fname)
+        n = len(content) // _LC5_DTYPE.itemsize
+        arr = np.frombuffer(content, dtype=_LC5_DTYPE, count=n)
+        date = arr['date'].astype(np.int64)
+        time = arr['time'].astype(np.int64)
+        dt = pd.to_datetime(pd.DataFrame({
+            'year': date // 2048 + 2004,
+            'month': date % 2048 // 100,
+            'day': date % 2048 % 100,
+            'hour': time // 60,
+            'minute': time % 60,
+        }))
+        # 价格/成交额保持盘面原生 float32（f4 是文件存储精度，升 f8 不
+        # 增加信息只翻倍带宽）；volume 取 int64——分钟 bar 本身 u4 够用，
+        # 但重采样求和可能越界，聚合列不做窄化
+        return pd.DataFrame({
+            'datetime': dt,
+            'open': np.ascontiguousarray(arr['open']),
+            'high': np.ascontiguousarray(arr['high']),
+            'low': np.ascontiguousarray(arr['low']),
+            'close': np.ascontiguousarray(arr['close']),
+            'amount': np.ascontiguousarray(arr['amount']),
+            'volume': arr['volume'].astype(np.int64),
+        }, copy=False)
+
+    def _read_lc5(self, market: int, code: str) -> pd.DataFrame:
+        """读取并规整单只股票的 5 分钟帧（read_min_data / read_5min_data
+        的公共路径：路径构建、存在性检查、解析、code/market 附加、dtype 兜底）
 
         Returns:
-            list: [15分钟数据, 30分钟数据, 60分钟数据]
+            DataFrame: datetime 为列（无索引）的 5 分钟数据
         """
         # 构建分钟线数据文件路径
         market_folder = 'sz' if market == 0 else 'sh'
-        freq_folder = 'fzline'
-        data_path = self.tdx_path / 'vipdoc' / market_folder / freq_folder
-        file_path = data_path /f"{market_folder}{code}.lc5"  # 只读取5分钟数据
+        data_path = self.tdx_path / 'vipdoc' / market_folder / 'fzline'
 
-        if not file_path.exists():
+        if (len(code)>6):
+            code = code[-6:]
+        file_path = data_path /f"{market_folder}{code}.lc5"
+
+        if not self._has_file(data_path, file_path.name):
             raise FileNotFoundError(f"5分钟线数据文件不存在: {file_path}")
 
         # 读取5分钟数据（per-stock 日志降为 debug：全量同步时 5000+ 只的 INFO 会淹没进度条）
-        logger.debug(f"正在读取 {code} 的5分钟线数据...")
-        data = self.lc_min_reader.get_df(str(file_path))
-        data['code'] = code
+        logger.debug("正在读取 %s 的5分钟线数据...", code)
+        data = self._read_lc5_fast(str(file_path))
+        # code 用单类目 categorical 广播：整列只存 int8 码 + 一个字符串，
+        # 比逐行 object 指针省一个数量级内存，全量合并时尤其明显
+        data['code'] = pd.Categorical.from_codes(
+            np.zeros(len(data), dtype=np.int8), categories=[code]
+        )
         data['market'] = market
 
-        # 确保datetime列存在并且是日期时间类型
-        if 'datetime' not in data.columns:
-            # 如果没有datetime列，尝试从index创建
-            if isinstance(data.index, pd.DatetimeIndex):
-                data['datetime'] = data.index
-            else:
-                raise ValueError("数据中缺少datetime列且索引不是日期时间类型")
-        elif not pd.api.types.is_datetime64_any_dtype(data['datetime']):
-            data['datetime'] = pd.to_datetime(data['datetime'])
-
-        # 设置datetime为索引，用于后续resample操作
-        data.set_index('datetime', inplace=True)
+        # _read_lc5_fast 恒定产出 datetime64[ns] 的 datetime 列，
+        # 单个 dtype 比较兜底即可（仅非常规来源才会触发转换）
+        if data['datetime'].dtype != _DT64_NS:
+            data['datetime'] = _ensure_datetime(data['datetime'])
 
         # 记得定期获取最新的数据，同步进TDX
-        logger.debug(f"数据时间范围: {data.index[0]} ~ {data.index[-1]}")
+        logger.debug("数据时间范围: %s ~ %s", data['datetime'].iloc[0], data['datetime'].iloc[-1])
 
-        # 重采样生成多周期数据
-        data_15min = DataProcessor.resample_ohlcv(data, '15min')
-        data_30min = DataProcessor.resample_ohlcv(data, '30min')
-        data_60min = DataProcessor.resample_ohlcv(data, '60min')
+        return data
 
-        data.reset_index(inplace=True)
+    def read_min_data(self, market: int, code: str) -> List[pd.DataFrame]:
+        """读取5分钟线数据并生成15分钟、30分钟和60分数据
+
+        Args:
+            market: 市场代码，0表示深圳，1表示上海
+            code: 股票代码
+
+        Returns:
+            list: [15分钟数据, 30分钟数据, 60分钟数据]
+        """
+        data = self._read_lc5(market, code)
+
+        # 重采样生成多周期数据：级联 5→15→30→60，每级输入行数约为上一级
+        # 一半，聚合总量比三次都从 5 分钟起算少 ~2/3。OHLCV 聚合对相邻
+        # bin 可结合，且 15/30/60 的 bin 边界逐级嵌套，结果与直接重采样一致。
+        # datetime 保持列形态，resample(on=) 直接分 bin，免 set_index 重建
+        data_15min = DataProcessor.resample_ohlcv(data, '15min')
+        data_30min = DataProcessor.resample_ohlcv(data_15min, '30min')
+        data_60min = DataProcessor.resample_ohlcv(data_30min, '60min')
 
         return [data_15min, data_30min, data_60min]
 
@@ -287,90 +428,78 @@ class TdxDataReader:
         Returns:
             DataFrame: 5分钟数据
         """
-        # 构建分钟线数据文件路径
-        market_folder = 'sz' if market == 0 else 'sh'
-        freq_folder = 'fzline'
-        data_path = self.tdx_path / 'vipdoc' / market_folder / freq_folder
-
-        if (len(code)>6):
-            code = code[-6:]
-        file_path = data_path /f"{market_folder}{code}.lc5"
-
-        if not file_path.exists():
-            raise FileNotFoundError(f"5分钟线数据文件不存在: {file_path}")
-
-        # 读取5分钟数据（per-stock 日志降为 debug，理由同上）
-        logger.debug(f"正在读取 {code} 的5分钟线数据...")
-        data = self.lc_min_reader.get_df(str(file_path))
-        data['code'] = code
-        data['market'] = market
-
-        # 确保datetime列存在并且是日期时间类型
-        if 'datetime' not in data.columns:
-            # 如果没有datetime列，尝试从index创建
-            if isinstance(data.index, pd.DatetimeIndex):
-                data['datetime'] = data.index
-            else:
-                raise ValueError("数据中缺少datetime列且索引不是日期时间类型")
-        elif not pd.api.types.is_datetime64_any_dtype(data['datetime']):
-            data['datetime'] = pd.to_datetime(data['datetime'])
-
-        # 设置datetime为索引，用于后续resample操作
-        data.set_index('datetime', inplace=True)
-
-        # 记得定期获取最新的数据，同步进TDX
-        logger.debug(f"数据时间范围: {data.index[0]} ~ {data.index[-1]}")
-
-        # 重置索引，使datetime成为列
-        data.reset_index(inplace=True)
-
-        return data
+        return self._read_lc5(market, code)
 
     def read_all_daily_data(self) -> pd.DataFrame:
         """读取所有股票的日线数据
 
         Returns:
-            DataFrame: 所有股票的日线数据
+            DataFrame: 所有股票的日线数据（date/OHLCV/code/market）
         """
         # 获取股票列表
         stocks = self.get_stock_list()
         logger.info(f"获取到 {len(stocks)} 只股票，开始读取日线数据...")
 
-        all_data = []
-        iterator = tqdm(stocks.iterrows(), total=len(stocks)) if config.use_tqdm else stocks.iterrows()
-
-        for _, stock in iterator:
-            code = stock['code']
-            # 判断市场
-            if code.startswith('sh'):
-                market = 1  # 上海
-            else:
-                market = 0  # 深圳
-
-            try:
-                data = self.read_daily_data(market, code)
-                # 确保datetime是列而不是索引
-                if isinstance(data.index, pd.DatetimeIndex) or data.index.name == 'datetime':
-                    data = data.reset_index()
-                all_data.append(data)
-            except FileNotFoundError:
-                continue
-            except Exception as e:
-                logger.error(f"读取 {code} 日线数据时出错: {e}")
-                continue
-
-        if not all_data:
+        def _read_raw(code: str) -> np.ndarray:
+            """worker 只做 读文件 + frombuffer 结构化视图，解码/换算
+            留到主线程对拼好的大数组整批做一次"""
+            market_folder = 'sh' if code.startswith('sh') else 'sz'
+            data_path = self.tdx_path / 'vipdoc' / market_folder / 'lday'
+            file_path = data_path / f"{market_folder}{code[-6:]}.day"
+            if not self._has_file(data_path, file_path.name):
+                raise FileNotFoundError(str(file_path))
+            content = self._read_file_bytes(str(file_path))
+            return np.frombuffer(content, dtype=_DAY_DTYPE,
+                                 count=len(content) // _DAY_DTYPE.itemsize)
+
+        # 文件读取大部分时间不持 GIL，线程池并行收益接近线性；
+        # 线程数与 cli 流式同步共用 SYNC_WORKERS 配置
+        arrays = []
+        kept_codes = []   # 6 位纯数字，与 daily_data 表口径一致
+        markets = []
+        codes = stocks['code'].tolist()
+        with ThreadPoolExecutor(max_workers=config.sync_workers) as pool:
+            futures = {pool.submit(_read_raw, code): code for code in codes}
+            completed = as_completed(futures)
+            if config.use_tqdm:
+                completed = tqdm(completed, total=len(futures))
+            for future in completed:
+                code = futures[future]
+                try:
+                    arr = future.result()
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logger.error(f"读取 {code} 日线数据时出错: {e}")
+                    continue
+                if len(arr):
+                    arrays.append(arr)
+                    kept_codes.append(code[-6:])
+                    markets.append(1 if code.startswith('sh') else 0)
+
+        if not arrays:
             return pd.DataFrame()
 
-        # 合并数据时保留datetime列
-        result_df = pd.concat(all_data, ignore_index=True)
-
-        # 确保datetime列存在并且是正确的日期时间格式
-        if 'datetime' in result_df.columns and not pd.api.types.is_datetime64_any_dtype(result_df['datetime']):
-            try:
-                result_df['datetime'] = pd.to_datetime(result_df['datetime'])
-            except Exception as e:
-                logger.warning(f"转换datetime列时出错: {e}")
-
-        return result_df
+        # 单次 concatenate 拼成一个结构化大数组，日期解码/系数换算整列
+        # 做一次，DataFrame 从 6k 次构建摊成 1 次；code 用类目 + repeat
+        # 的码表示，market 同样按段 repeat
+        big = np.concatenate(arrays)
+        lengths = np.fromiter((len(a) for a in arrays), dtype=np.int64, count=len(arrays))
+        code_idx = np.repeat(np.arange(len(arrays), dtype=np.int32), lengths)
+        date_int = big['date'].astype(np.int64)
+        return pd.DataFrame({
+            'date': pd.to_datetime(pd.DataFrame({
+                'year': date_int // 10000,
+                'month': date_int // 100 % 100,
+                'day': date_int % 100,
+            })),
+            'open': big['open'] * 0.01,
+            'high': big['high'] * 0.01,
+            'low': big['low'] * 0.01,
+            'close': big['close'] * 0.01,
+            'amount': big['amount'].astype(np.float64),
+            'volume': big['volume'] * 0.01,
+            'code': pd.Categorical.from_codes(code_idx, categories=kept_codes),
+            'market': np.repeat(np.asarray(markets, dtype=np.int8), lengths),
+        }, copy=False)
 
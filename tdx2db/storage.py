@@ -7,9 +7,11 @@
 
 import os
 from datetime import datetime as dt
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, inspect, Column, Date, Integer, Float, String, DateTime, MetaData, Table, UniqueConstraint, text
 from sqlalchemy.ext.declarative import declarative_base
@@ -19,6 +21,37 @@ from tqdm import tqdm
 from .config import config
 from .logger import logger
 
+# pyarrow 为可选加速依赖（extras: speed）：大 CSV 用其多线程 C++ 写出，
+# 未安装或小数据量时回退 pandas to_csv，输出内容一致
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+# 低于此行数时 pandas 足够快，且免去 Arrow 表转换的固定开销
+_ARROW_CSV_MIN_ROWS = 100_000
+
+# 每个 CSV 文件允许排队的待写帧上限：写盘慢于读取+处理时阻塞提交方，
+# 否则待写帧无限堆积会把流式同步省下的内存峰值吃回去
+# （与 cli._bounded_thread_map 的 2×workers 窗口同一思路）
+_CSV_QUEUE_DEPTH = 4
+
+# SQLAlchemy insertmanyvalues 的内部分页，按方言取甜点：
+# PG 约 1k 后收益趋平，MySQL/SQLite 页越大越省往返
+_INSERTMANY_PAGE_SIZE = {'postgresql': 1000, 'mysql': 50000, 'sqlite': 50000}
+
+# PostgreSQL 增量写入走“COPY 进临时表再 INSERT..SELECT 跳重”的最小行数：
+# 低于此值 execute_values 更划算（免建表/删表的固定开销）
+_PG_STAGE_MIN_ROWS = 50_000
+
+# 写出前降为 float32 的列：价格与均线 float32 的 7 位有效数字绰绰有余
+# （股价千元级 + 2 位小数），宽度减半省一半磁盘/网络字节。
+# volume/amount 可达 1e10 量级，保持 float64 不动
+_F32_COLUMNS = ('open', 'high', 'low', 'close',
+                'ma5', 'ma10', 'ma13', 'ma21', 'ma34', 'ma55',
+                'ma60', 'ma89', 'ma144', 'ma233', 'ma250')
+
 Base = declarative_base()
 
 class BlockStockRelation(Base):
@@ -44,27 +77,31 @@ class DailyData(Base):
     __table_args__ = (UniqueConstraint('code', 'date', name='uq_daily_code_date'),)
 
     id = Column(Integer, primary_key=True)
-    code = Column(String(10), index=True)
+    # code 不再单独建索引：(code, date) 唯一索引的前缀已覆盖按 code 查询
+    code = Column(String(10))
     market = Column(Integer)
     datetime = Column(DateTime, index=True)
-    date = Column(DateTime, index=True)
-    open = Column(Float)
-    high = Column(Float)
-    low = Column(Float)
-    close = Column(Float)
+    # date 列在 SQLite 按 DATE 变体落盘（'2026-01-21'）：与历史行一致，
+    # 消费方 WHERE date = '...' 等值过滤不漏行（normalize 零点时间戳若按
+    # DATETIME 落盘会写成 '.. 00:00:00.000000'，同列混两种格式）
+    date = Column(DateTime().with_variant(Date(), 'sqlite'), index=True)
+    open = Column(Float(24))
+    high = Column(Float(24))
+    low = Column(Float(24))
+    close = Column(Float(24))
     volume = Column(Float)
     amount = Column(Float)
-    ma13 = Column(Float)
-    ma21 = Column(Float)
-    ma34 = Column(Float)
-    ma55 = Column(Float)
-    ma89 = Column(Float)
-    ma144 = Column(Float)
-    ma233 = Column(Float)
-    ma5 = Column(Float)
-    ma10 = Column(Float)
-    ma60 = Column(Float)
-    ma250 = Column(Float)
+    ma13 = Column(Float(24))
+    ma21 = Column(Float(24))
+    ma34 = Column(Float(24))
+    ma55 = Column(Float(24))
+    ma89 = Column(Float(24))
+    ma144 = Column(Float(24))
+    ma233 = Column(Float(24))
+    ma5 = Column(Float(24))
+    ma10 = Column(Float(24))
+    ma60 = Column(Float(24))
+    ma250 = Column(Float(24))
 
 class Minute5Data(Base):
     """5分钟线数据表模型"""
@@ -72,27 +109,29 @@ class Minute5Data(Base):
     __table_args__ = (UniqueConstraint('code', 'datetime', name='uq_minute5_code_datetime'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    code = Column(String(10), nullable=False, index=True)
+    # code 不再单独建索引：(code, datetime) 唯一索引的前缀已覆盖
+    code = Column(String(10), nullable=False)
     market = Column(Integer, nullable=False)
     datetime = Column(DateTime, nullable=False, index=True)
-    date = Column(DateTime, nullable=False, index=True)
-    open = Column(Float, nullable=False)
-    high = Column(Float, nullable=False)
-    low = Column(Float, nullable=False)
-    close = Column(Float, nullable=False)
+    # date 列 SQLite DATE 变体，理由见 DailyData
+    date = Column(DateTime().with_variant(Date(), 'sqlite'), nullable=False, index=True)
+    open = Column(Float(24), nullable=False)
+    high = Column(Float(24), nullable=False)
+    low = Column(Float(24), nullable=False)
+    close = Column(Float(24), nullable=False)
     volume = Column(Float, nullable=False)
     amount = Column(Float, nullable=False)
-    ma13 = Column(Float)
-    ma21 = Column(Float)
-    ma34 = Column(Float)
-    ma55 = Column(Float)
-    ma89 = Column(Float)
-    ma144 = Column(Float)
-    ma233 = Column(Float)
-    ma5 = Column(Float)
-    ma10 = Column(Float)
-    ma60 = Column(Float)
-    ma250 = Column(Float)
+    ma13 = Column(Float(24))
+    ma21 = Column(Float(24))
+    ma34 = Column(Float(24))
+    ma55 = Column(Float(24))
+    ma89 = Column(Float(24))
+    ma144 = Column(Float(24))
+    ma233 = Column(Float(24))
+    ma5 = Column(Float(24))
+    ma10 = Column(Float(24))
+    ma60 = Column(Float(24))
+    ma250 = Column(Float(24))
 
 class Minute15Data(Base):
     """15分钟线数据表模型"""
@@ -100,56 +139,60 @@ class Minute15Data(Base):
     __table_args__ = (UniqueConstraint('code', 'datetime', name='uq_minute15_code_datetime'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    code = Column(String(10), nullable=False, index=True)
+    # code 不再单独建索引：(code, datetime) 唯一索引的前缀已覆盖
+    code = Column(String(10), nullable=False)
     market = Column(Integer, nullable=False)
     datetime = Column(DateTime, nullable=False, index=True)
-    date = Column(DateTime, nullable=False, index=True)
-    open = Column(Float, nullable=False)
-    high = Column(Float, nullable=False)
-    low = Column(Float, nullable=False)
-    close = Column(Float, nullable=False)
+    # date 列 SQLite DATE 变体，理由见 DailyData
+    date = Column(DateTime().with_variant(Date(), 'sqlite'), nullable=False, index=True)
+    open = Column(Float(24), nullable=False)
+    high = Column(Float(24), nullable=False)
+    low = Column(Float(24), nullable=False)
+    close = Column(Float(24), nullable=False)
     volume = Column(Float, nullable=False)
     amount = Column(Float, nullable=False)
     # 添加技术指标列
-    ma13 = Column(Float)
-    ma21 = Column(Float)
-    ma34 = Column(Float)
-    ma55 = Column(Float)
-    ma89 = Column(Float)
-    ma144 = Column(Float)
-    ma233 = Column(Float)
-    ma5 = Column(Float)
-    ma10 = Column(Float)
-    ma60 = Column(Float)
-    ma250 = Column(Float)
+    ma13 = Column(Float(24))
+    ma21 = Column(Float(24))
+    ma34 = Column(Float(24))
+    ma55 = Column(Float(24))
+    ma89 = Column(Float(24))
+    ma144 = Column(Float(24))
+    ma233 = Column(Float(24))
+    ma5 = Column(Float(24))
+    ma10 = Column(Float(24))
+    ma60 = Column(Float(24))
+    ma250 = Column(Float(24))
 class Minute30Data(Base):
     """30分钟线数据表模型"""
     __tablename__ = 'minute30_data'
     __table_args__ = (UniqueConstraint('code', 'datetime', name='uq_minute30_code_datetime'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    code = Column(String(10), nullable=False, index=True)
+    # code 不再单独建索引：(code, datetime) 唯一索引的前缀已覆盖
+    code = Column(String(10), nullable=False)
     market = Column(Integer, nullable=False)
     datetime = Column(DateTime, nullable=False, index=True)
-    date = Column(DateTime, nullable=False, index=True)
-    open = Column(Float, nullable=False)
-    high = Column(Float, nullable=False)
-    low = Column(Float, nullable=False)
-    close = Column(Float, nullable=False)
+    # date 列 SQLite DATE 变体，理由见 DailyData
+    date = Column(DateTime().with_variant(Date(), 'sqlite'), nullable=False, index=True)
+    open = Column(Float(24), nullable=False)
+    high = Column(Float(24), nullable=False)
+    low = Column(Float(24), nullable=False)
+    close = Column(Float(24), nullable=False)
     volume = Column(Float, nullable=False)
     amount = Column(Float, nullable=False)
     # 添加技术指标列
-    ma13 = Column(Float)
-    ma21 = Column(Float)
-    ma34 = Column(Float)
-    ma55 = Column(Float)
-    ma89 = Column(Float)
-    ma144 = Column(Float)
-    ma233 = Column(Float)
-    ma5 = Column(Float)
-    ma10 = Column(Float)
-    ma60 = Column(Float)
-    ma250 = Column(Float)
+    ma13 = Column(Float(24))
+    ma21 = Column(Float(24))
+    ma34 = Column(Float(24))
+    ma55 = Column(Float(24))
+    ma89 = Column(Float(24))
+    ma144 = Column(Float(24))
+    ma233 = Column(Float(24))
+    ma5 = Column(Float(24))
+    ma10 = Column(Float(24))
+    ma60 = Column(Float(24))
+    ma250 = Column(Float(24))
 
 class Minute60Data(Base):
     """60分钟线数据表模型"""
@@ -157,28 +200,30 @@ class Minute60Data(Base):
     __table_args__ = (UniqueConstraint('code', 'datetime', name='uq_minute60_code_datetime'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    code = Column(String(10), nullable=False, index=True)
+    # code 不再单独建索引：(code, datetime) 唯一索引的前缀已覆盖
+    code = Column(String(10), nullable=False)
     market = Column(Integer, nullable=False)
     datetime = Column(DateTime, nullable=False, index=True)
-    date = Column(DateTime, nullable=False, index=True)
-    open = Column(Float, nullable=False)
-    high = Column(Float, nullable=False)
-    low = Column(Float, nullable=False)
-    close = Column(Float, nullable=False)
+    # date 列 SQLite DATE 变体，理由见 DailyData
+    date = Column(DateTime().with_variant(Date(), 'sqlite'), nullable=False, index=True)
+    open = Column(Float(24), nullable=False)
+    high = Column(Float(24), nullable=False)
+    low = Column(Float(24), nullable=False)
+    close = Column(Float(24), nullable=False)
     volume = Column(Float, nullable=False)
     amount = Column(Float, nullable=False)
     # 添加技术指标列
-    ma13 = Column(Float)
-    ma21 = Column(Float)
-    ma34 = Column(Float)
-    ma55 = Column(Float)
-    ma89 = Column(Float)
-    ma144 = Column(Float)
-    ma233 = Column(Float)
-    ma5 = Column(Float)
-    ma10 = Column(Float)
-    ma60 = Column(Float)
-    ma250 = Column(Float)
+    ma13 = Column(Float(24))
+    ma21 = Column(Float(24))
+    ma34 = Column(Float(24))
+    ma55 = Column(Float(24))
+    ma89 = Column(Float(24))
+    ma144 = Column(Float(24))
+    ma233 = Column(Float(24))
+    ma5 = Column(Float(24))
+    ma10 = Column(Float(24))
+    ma60 = Column(Float(24))
+    ma250 = Column(Float(24))
 
 class StockInfo(Base):
     """股票信息表模型
@@ -223,7 +268,8 @@ class DataStorage:
         self,
         db_url: Optional[str] = None,
         csv_path: Optional[str] = None,
-        create_tables: bool = True
+        create_tables: bool = True,
+        use_db: bool = True
     ) -> None:
         """初始化数据存储
 
@@ -231,9 +277,16 @@ class DataStorage:
             db_url: 数据库连接URL，如果为None则使用配置中的URL
             csv_path: CSV文件保存路径，如果为None则使用配置中的路径
             create_tables: 是否自动建表。status 等只读命令传 False，保证不产生任何写操作
+            use_db: 仅 CSV 输出的命令传 False，完全跳过引擎创建、建表与驱动导入
         """
-        self.db_url = db_url or config.database_url
+        self.db_url = (db_url or config.database_url) if use_db else None
         self.csv_path = csv_path or config.csv_output_path
+        # CSV 后台写线程（按文件名懒创建，每文件单线程）：
+        # 磁盘写与 DB 插入重叠，不同表的文件并行写出
+        self._csv_executors = {}
+        # 后台写盘的首个异常，flush_csv() 时重新抛出（异步化不能吞掉
+        # 写盘失败：cron 用户靠退出码监控）
+        self._csv_write_error: Optional[BaseException] = None
 
         # 确保CSV输出目录存在
         if self.csv_path:
@@ -241,8 +294,25 @@ class DataStorage:
 
         # 初始化数据库连接
         if self.db_url:
+            engine_kwargs = {
+                'insertmanyvalues_page_size':
+                    _INSERTMANY_PAGE_SIZE.get(config.db_type, 1000),
+            }
+            if config.db_type in ('postgresql', 'mysql'):
+                # 长跑同步中服务端可能掐掉空闲连接，取用前先 ping
+                engine_kwargs['pool_pre_ping'] = True
+            # psycopg2 的 executemany 默认逐条预处理执行；values_plus_batch
+            # 让 INSERT 走 insertmanyvalues、其余语句走 execute_batch，
+            # 驱动侧批量发送（INSERT 的分页即上面的
+            # insertmanyvalues_page_size，SQLAlchemy 2.0 已无
+            # executemany_values_page_size 参数）。其他数据库无此参数
+            if config.db_type == 'postgresql':
+                engine_kwargs.update(
+                    executemany_mode='values_plus_batch',
+                    executemany_batch_page_size=1000,
+                )
             try:
-                self.engine = create_engine(self.db_url)
+                self.engine = create_engine(self.db_url, **engine_kwargs)
             except ModuleNotFoundError as e:
                 # 数据库驱动为可选依赖，缺失时给出对应 extras 安装提示
                 extras = {'postgresql': 'postgres', 'mysql': 'mysql'}.get(config.db_type)
@@ -252,16 +322,47 @@ class DataStorage:
                         f"请安装: pip install 'tdx2db[{extras}]'"
                     ) from e
                 raise
+            if config.db_type == 'sqlite':
+                self._tune_sqlite(self.engine)
             if create_tables:
                 Base.metadata.create_all(self.engine)
             self.Session = sessionmaker(bind=self.engine)
 
-    def save_to_csv(self, df: pd.DataFrame, filename: str) -> Optional[str]:
-        """保存数据到CSV文件
+    @staticmethod
+    def _tune_sqlite(engine) -> None:
+        """SQLite 写入调优：每个新连接设置 WAL 等 PRAGMA
+
+        默认回滚日志模式下每次提交都是全量 fsync，批量导入很快被
+        fsync 卡死。WAL + synchronous=NORMAL 把提交成本降一个量级；
+        掉电最多丢最近事务、不会损坏库——对可随时重新同步的行情
+        缓存完全可接受。PRAGMA 是连接级属性，必须挂 connect 事件。
+        """
+        from sqlalchemy import event
+
+        @event.listens_for(engine, 'connect')
+        def _set_pragmas(dbapi_conn, _connection_record):
+            cursor = dbapi_conn.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA temp_store=MEMORY')
+            cursor.execute('PRAGMA cache_size=-200000')   # 约 200MB 页缓存
+            cursor.execute('PRAGMA mmap_size=268435456')  # 256MB mmap 读
+            cursor.close()
+
+    def save_to_csv(self, df: pd.DataFrame, filename: str, append: bool = False) -> Optional[str]:
+        """保存数据到CSV文件（后台线程异步写出）
+
+        写盘交给后台线程，通常立即返回，让磁盘 I/O 与后续的 DB 插入
+        重叠。每个文件名一条单工作线程：同一文件的追加保持先后顺序，
+        不同文件（如逐股票同步时的 4 张分钟表）并行写出。每文件在途
+        帧数有上限（_CSV_QUEUE_DEPTH），磁盘追不上时在此阻塞提交方，
+        保住逐股票流式的内存峰值。返回时文件未必已落盘：命令分支结束
+        前调用 flush_csv() 确定性落盘并让写盘失败重新浮出。
 
         Args:
             df: 要保存的DataFrame
             filename: 文件名（不包含路径和扩展名）
+            append: 追加到已有文件（不重写表头），流式逐股票写出时使用
 
         Returns:
             str: 保存的文件路径，如果没有数据则返回None
@@ -270,11 +371,116 @@ class DataStorage:
             logger.warning(f"没有数据可保存到 {filename}.csv")
             return None
 
+        df = self._downcast(df)
         file_path = Path(self.csv_path) / f"{filename}.csv"
-        df.to_csv(file_path, index=False, encoding='utf-8')
+        entry = self._csv_executors.get(filename)
+        if entry is None:
+            import threading
+            from concurrent.futures import ThreadPoolExecutor
+            entry = (ThreadPoolExecutor(max_workers=1,
+                                        thread_name_prefix=f'csv-{filename}'),
+                     threading.Semaphore(_CSV_QUEUE_DEPTH))
+            self._csv_executors[filename] = entry
+        executor, slots = entry
+        slots.acquire()  # 背压：该文件在途帧达上限时阻塞等写盘
+        future = executor.submit(self._write_csv, df, file_path, append)
+        future.add_done_callback(lambda f: self._csv_done(f, slots))
+        return str(file_path)
+
+    def _csv_done(self, future, slots) -> None:
+        """写盘任务汇合回调：释放在途名额，记下首个写盘异常"""
+        slots.release()
+        exc = future.exception()
+        if exc is not None and self._csv_write_error is None:
+            self._csv_write_error = exc
+
+    @staticmethod
+    def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+        """价格/均线列 float64 → float32（浅拷贝，不改调用方的帧）"""
+        cols = [c for c in _F32_COLUMNS
+                if c in df.columns and df[c].dtype == np.float64]
+        if not cols:
+            return df
+        df = df.copy(deep=False)
+        df[cols] = df[cols].astype(np.float32)
+        return df
+
+    @staticmethod
+    def _write_csv(df: pd.DataFrame, file_path: Path, append: bool) -> None:
+        """后台线程中的实际写盘；异常记日志后重抛，由 flush_csv() 汇合上报"""
+        try:
+            appending = append and file_path.exists()
+            if pa is not None and len(df) >= _ARROW_CSV_MIN_ROWS:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                mode = 'ab' if appending else 'wb'
+                with open(file_path, mode) as f:
+                    pa_csv.write_csv(
+                        table, f,
+                        write_options=pa_csv.WriteOptions(include_header=not appending),
+                    )
+            elif appending:
+                df.to_csv(file_path, index=False, encoding='utf-8', mode='a', header=False)
+            else:
+                df.to_csv(file_path, index=False, encoding='utf-8')
+            if appending:
+                # 追加模式按股票高频调用，降为 debug 免得刷屏
+                logger.debug("数据已追加到: %s", file_path)
+            else:
+                logger.info(f"数据已保存到: {file_path}")
+        except Exception as e:
+            logger.error(f"写入 {file_path} 失败: {e}")
+            raise
+
+    def save_to_parquet(self, df: pd.DataFrame, filename: str) -> Optional[str]:
+        """保存数据到 Parquet 文件（zstd 压缩）
+
+        列式布局 + 压缩对 OHLCV 这类数值宽表比 CSV 小、写读都快数倍。
+        Parquet 不支持追加写，仅适用于整帧输出；流式逐股票追加的场景
+        仍走 save_to_csv。
+
+        Args:
+            df: 要保存的DataFrame
+            filename: 文件名（不包含路径和扩展名）
+
+        Returns:
+            str: 保存的文件路径，如果没有数据则返回None
+        """
+        if df.empty:
+            logger.warning(f"没有数据可保存到 {filename}.parquet")
+            return None
+        if pa is None:
+            raise ValueError(
+                "Parquet 输出需要 pyarrow。请安装: pip install 'tdx2db[speed]'"
+            )
+
+        file_path = Path(self.csv_path) / f"{filename}.parquet"
+        df.to_parquet(file_path, engine='pyarrow', compression='zstd',
+                      index=False, row_group_size=100_000)
         logger.info(f"数据已保存到: {file_path}")
         return str(file_path)
 
+    def _save_file(self, df: pd.DataFrame, filename: str) -> Optional[str]:
+        """按 config.output_format 路由整帧文件输出（csv / parquet / both）"""
+        fmt = config.output_format
+        if fmt == 'parquet':
+            return self.save_to_parquet(df, filename)
+        if fmt == 'both':
+            self.save_to_parquet(df, filename)
+        return self.save_to_csv(df, filename)
+
+    def flush_csv(self) -> None:
+        """等待所有排队的 CSV 写盘完成；有任务写盘失败则重抛首个异常
+
+        save_to_csv 提交后立即返回，失败只能在此汇合点浮出——CSV 输出的
+        命令分支结束前必须调用，否则写盘失败不影响退出码。
+        """
+        for executor, _slots in self._csv_executors.values():
+            executor.shutdown(wait=True)
+        self._csv_executors.clear()
+        if self._csv_write_error is not None:
+            error, self._csv_write_error = self._csv_write_error, None
+            raise error
+
     def get_table_stats(self) -> list:
         """统计每张表的行数、覆盖股票数、日期范围。只读，供 status 命令使用。
 
@@ -333,15 +539,18 @@ class DataStorage:
             raise ValueError(f"非法日期列名: {date_column}")
         try:
             with self.engine.connect() as conn:
+                # ORDER BY .. LIMIT 1 而非 MAX()：保证走索引单次定位，
+                # 不依赖各数据库对聚合的 min/max 优化
                 result = conn.execute(
-                    text(f"SELECT MAX({date_column}) FROM {table_name}")
+                    text(f"SELECT {date_column} FROM {table_name} "
+                         f"ORDER BY {date_column} DESC LIMIT 1")
                 )
                 row = result.fetchone()
                 if row and row[0]:
                     return self._coerce_datetime(row[0])
                 return None
         except Exception as e:
-            logger.debug(f"获取表 {table_name} 最新日期时出错: {e}")
+            logger.debug("获取表 %s 最新日期时出错: %s", table_name, e)
             return None
 
     def get_latest_datetime_by_code(
@@ -366,8 +575,10 @@ class DataStorage:
             raise ValueError(f"非法日期列名: {date_column}")
         try:
             with self.engine.connect() as conn:
+                # (code, datetime) 唯一索引下等价于一次索引定位
                 result = conn.execute(
-                    text(f"SELECT MAX({date_column}) FROM {table_name} WHERE code = :code"),
+                    text(f"SELECT {date_column} FROM {table_name} WHERE code = :code "
+                         f"ORDER BY {date_column} DESC LIMIT 1"),
                     {"code": code}
                 )
                 row = result.fetchone()
@@ -406,87 +617,249 @@ class DataStorage:
             logger.warning(f"没有数据可保存到表 {table_name}")
             return 0
 
-        total_rows = len(df)
-
-        # 确保 datetime 不是索引而是列
-        df_to_save = df.copy()
-        if df_to_save.index.name == 'datetime' or isinstance(df_to_save.index, pd.DatetimeIndex):
-            df_to_save = df_to_save.reset_index()
-
-        # 获取列名
-        columns = list(df_to_save.columns)
-        columns_str = ', '.join(columns)
-        db_type = config.db_type
+        # 帧内先按冲突键去重（保留最后一条）：留给 ON CONFLICT 也能跳过，
+        # 但那要付完解析与约束检查；源文件里的重复在内存里剔掉更便宜
+        df = self._reset_datetime_index(df)
+        if all(col in df.columns for col in conflict_columns):
+            df = df.drop_duplicates(subset=list(conflict_columns), keep='last')
 
         try:
-            if db_type == 'postgresql':
-                self._save_incremental_pg(
-                    df_to_save, columns, columns_str,
-                    table_name, conflict_columns, batch_size
-                )
+            if config.db_type == 'postgresql':
+                raw_conn = self.engine.raw_connection()
+                try:
+                    total_rows = self._insert_ignore_pg(
+                        raw_conn.cursor(), df, table_name, conflict_columns, batch_size
+                    )
+                    raw_conn.commit()
+                finally:
+                    raw_conn.close()
             else:
-                # MySQL / SQLite: 走 SQLAlchemy executemany
-                placeholders = ', '.join([f':{col}' for col in columns])
-                if db_type == 'mysql':
-                    sql = text(f"INSERT IGNORE INTO {table_name} ({columns_str}) VALUES ({placeholders})")
-                elif db_type == 'sqlite':
-                    sql = text(f"INSERT OR IGNORE INTO {table_name} ({columns_str}) VALUES ({placeholders})")
-                else:
-                    raise ValueError(f"不支持的数据库类型: {db_type}")
-
-                with self.engine.connect() as conn:
-                    for i in range(0, total_rows, batch_size):
-                        batch_df = df_to_save.iloc[i:i + batch_size]
-                        # sqlite3 适配器按精确类型匹配，不识别 pd.Timestamp（虽是
-                        # datetime 子类）；先转 dict 再逐值转换，避开 pandas 类型推断
-                        records = [
-                            {
-                                k: (None if pd.isna(v) else
-                                    v.to_pydatetime() if isinstance(v, pd.Timestamp) else v)
-                                for k, v in rec.items()
-                            }
-                            for rec in batch_df.to_dict('records')
-                        ]
-                        conn.execute(sql, records)
-                        conn.commit()
+                # 所有批次共用一个事务，结束时一次性提交（与 save_incremental_many 一致）
+                with self.engine.begin() as conn:
+                    total_rows = self._insert_ignore(
+                        conn, df, table_name, batch_size
+                    )
 
             # per-call 日志降为 debug：全量同步时每股 ×4 表的 INFO 会淹没进度条
-            logger.debug(f"增量保存完成: 共处理 {total_rows} 条到表 {table_name}（重复数据已跳过）")
+            logger.debug("增量保存完成: 共处理 %s 条到表 %s（重复数据已跳过）", total_rows, table_name)
             return total_rows
 
         except Exception as e:
             logger.error(f"增量保存数据到表 {table_name} 时出错: {e}")
             return 0
 
-    def _save_incremental_pg(
+    def save_incremental_many(
         self,
+        items: list,
+        batch_size: int = 10000
+    ) -> int:
+        """在同一连接、同一事务中增量保存多组数据
+
+        单只股票一次分钟同步要写 4 张表，逐表调用 save_incremental 要付
+        4 次连接获取 + 4 次提交；这里全部批次共用一个连接、最后一次性
+        提交，任一表失败整体回滚（不会留下周期间不一致的半成品）。
+
+        Args:
+            items: (df, table_name, conflict_columns) 三元组列表
+            batch_size: 批处理大小
+
+        Returns:
+            int: 实际处理的总行数（重复已跳过），失败返回 0
+        """
+        items = [(df, t, c) for df, t, c in items if not df.empty]
+        for _, table_name, _ in items:
+            if table_name not in _VALID_TABLES:
+                raise ValueError(f"不允许写入的表名: {table_name}")
+        if not items:
+            return 0
+
+        total_rows = 0
+        try:
+            if config.db_type == 'postgresql':
+                raw_conn = self.engine.raw_connection()
+                try:
+                    cursor = raw_conn.cursor()
+                    for df, table_name, conflict_columns in items:
+                        total_rows += self._insert_ignore_pg(
+                            cursor, df, table_name, conflict_columns, batch_size
+                        )
+                    raw_conn.commit()
+                finally:
+                    raw_conn.close()
+            else:
+                with self.engine.begin() as conn:
+                    for df, table_name, _ in items:
+                        total_rows += self._insert_ignore(conn, df, table_name, batch_size)
+
+            logger.debug("增量保存完成: 共处理 %s 条到 %s 张表（单事务，重复数据已跳过）",
+                         total_rows, len(items))
+            return total_rows
+        except Exception as e:
+            tables = ', '.join(t for _, t, _ in items)
+            logger.error(f"增量保存数据到表 {tables} 时出错（已整体回滚）: {e}")
+            return 0
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _ignore_stmt(db_type: str, table_name: str):
+        """按 (db_type, 表名) 缓存跳重 INSERT 的 Core 语句
+
+        流式同步逐股票调用写入，同一张表的语句构造会重复几千次；
+        用声明模型自带的 Table 元数据构造（无需反射），Core 语句
+        走 SQLAlchemy 的编译缓存，executemany 时只编译一次。
+        """
+        tbl = Base.metadata.tables[table_name]
+        if db_type == 'mysql':
+            from sqlalchemy import insert
+            return insert(tbl).prefix_with('IGNORE')
+        if db_type == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+            return sqlite_insert(tbl).on_conflict_do_nothing()
+        raise ValueError(f"不支持的数据库类型: {db_type}")
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _ignore_sql_pg(table_name: str, columns: Tuple[str, ...],
+                       conflict_columns: Tuple[str, ...]) -> str:
+        """PostgreSQL 版跳重 INSERT 模板（execute_values 的 VALUES %s 形式）"""
+        columns_str = ', '.join(columns)
+        conflict_str = ', '.join(conflict_columns)
+        return (f"INSERT INTO {table_name} ({columns_str}) VALUES %s "
+                f"ON CONFLICT ({conflict_str}) DO NOTHING")
+
+    @staticmethod
+    def _reset_datetime_index(df: pd.DataFrame) -> pd.DataFrame:
+        """确保 datetime 是列而不是索引"""
+        if df.index.name == 'datetime' or isinstance(df.index, pd.DatetimeIndex):
+            return df.reset_index()
+        return df
+
+    def _insert_ignore(
+        self,
+        conn,
+        df: pd.DataFrame,
+        table_name: str,
+        batch_size: int,
+    ) -> int:
+        """MySQL / SQLite：在给定连接上分批 executemany 插入并跳过重复，不提交"""
+        df_to_save = self._reset_datetime_index(df)
+        sql = self._ignore_stmt(config.db_type, table_name)
+
+        # 行字典整帧一次构造，不逐值判断：NaN→None 整列 where 完成；
+        # datetime 列经 numpy M8[us]→tolist 整列转原生 datetime
+        # （sqlite3 适配器不识别 pd.Timestamp，NaT 顺带变 None）
+        df_clean = df_to_save.astype(object).where(df_to_save.notna(), None)
+        for col in df_to_save.columns:
+            if pd.api.types.is_datetime64_any_dtype(df_to_save[col]):
+                # dtype=object 防止 pandas 把 datetime 列表又推断回 Timestamp
+                df_clean[col] = pd.Series(
+                    df_to_save[col].to_numpy().astype('datetime64[us]').tolist(),
+                    index=df_clean.index, dtype=object,
+                )
+        records = df_clean.to_dict('records')
+
+        total_rows = len(df_to_save)
+        for i in range(0, total_rows, batch_size):
+            conn.execute(sql, records[i:i + batch_size])
+        return total_rows
+
+    def _insert_ignore_pg(
+        self,
+        cursor,
         df: pd.DataFrame,
-        columns: list,
-        columns_str: str,
         table_name: str,
         conflict_columns: Tuple[str, ...],
         batch_size: int,
-    ) -> None:
-        """PostgreSQL 专用：使用 execute_values 真正批量插入
+    ) -> int:
+        """PostgreSQL：在给定游标上用 execute_values 批量插入，不提交
 
         一次网络往返插入整批数据，比 executemany 快 10-100x。
+        大帧改走 COPY + 临时表跳重（_insert_ignore_pg_stage）。
         """
         from psycopg2.extras import execute_values
 
-        conflict_str = ', '.join(conflict_columns)
-        sql = f"INSERT INTO {table_name} ({columns_str}) VALUES %s ON CONFLICT ({conflict_str}) DO NOTHING"
+        df_to_save = self._reset_datetime_index(df)
+        if len(df_to_save) >= _PG_STAGE_MIN_ROWS:
+            return self._insert_ignore_pg_stage(cursor, df_to_save, table_name, conflict_columns)
+        sql = self._ignore_sql_pg(table_name, tuple(df_to_save.columns), tuple(conflict_columns))
 
         # DataFrame → list of tuples，NaN/NaT → None（psycopg2 需要 None 表示 NULL）
-        df_clean = df.astype(object).where(df.notna(), None)
+        df_clean = df_to_save.astype(object).where(df_to_save.notna(), None)
         values = list(df_clean.itertuples(index=False, name=None))
 
-        raw_conn = self.engine.raw_connection()
-        try:
-            cursor = raw_conn.cursor()
-            execute_values(cursor, sql, values, page_size=batch_size)
-            raw_conn.commit()
-        finally:
-            raw_conn.close()
+        execute_values(cursor, sql, values, page_size=batch_size)
+        return len(df_to_save)
+
+    @staticmethod
+    def _insert_ignore_pg_stage(cursor, df_to_save: pd.DataFrame, table_name: str,
+                                conflict_columns: Tuple[str, ...]) -> int:
+        """PostgreSQL 大帧跳重写入：COPY 进 UNLOGGED 临时表，再 INSERT..SELECT
+
+        VALUES 列表再快也要逐批解析/计划，且用不上 COPY；先把整帧
+        COPY 进无 WAL 的临时表，再一条 INSERT..SELECT ON CONFLICT
+        DO NOTHING 去重落库——拿到 COPY 的吞吐、保住跳重语义。
+        与调用方共用事务，不在此提交；失败时整体回滚（临时表一并消失）。
+        返回处理行数（含被跳过的重复），与 execute_values 路径同一口径。
+        """
+        import io
+        from uuid import uuid4
+
+        columns_str = ', '.join(df_to_save.columns)
+        conflict_str = ', '.join(conflict_columns)
+        stage = f"stage_{table_name}_{uuid4().hex[:8]}"
+
+        cursor.execute(
+            f"CREATE UNLOGGED TABLE {stage} (LIKE {table_name} INCLUDING DEFAULTS)"
+        )
+        buf = io.StringIO()
+        # CSV 空字段经 COPY 映射为 NULL，NaN/NaT 无需预处理
+        df_to_save.to_csv(buf, index=False, header=False)
+        buf.seek(0)
+        cursor.copy_expert(f"COPY {stage} ({columns_str}) FROM STDIN WITH CSV", buf)
+        cursor.execute(
+            f"INSERT INTO {table_name} ({columns_str}) "
+            f"SELECT {columns_str} FROM {stage} "
+            f"ON CONFLICT ({conflict_str}) DO NOTHING"
+        )
+        # rowcount 是冲突跳过后的净插入数，仅作诊断日志；返回值保持
+        # “共处理 N 条”的口径，否则 50k 行阈值两侧统计含义悄悄不同
+        logger.debug("临时表跳重写入 %s: 处理 %s 条，净插入 %s 条",
+                     table_name, len(df_to_save), cursor.rowcount)
+        cursor.execute(f"DROP TABLE {stage}")
+        return len(df_to_save)
+
+    @staticmethod
+    def _psql_copy(table, conn, keys, data_iter):
+        """pandas to_sql 的 method= 回调：PostgreSQL 走 COPY FROM STDIN
+
+        COPY 是各批量路径里最快的一条（比逐条 INSERT 高一个数量级），
+        None 经 CSV 空字段映射为 NULL。
+        """
+        import csv
+        import io
+
+        buf = io.StringIO()
+        csv.writer(buf).writerows(data_iter)
+        buf.seek(0)
+
+        table_name = f'{table.schema}.{table.name}' if table.schema else table.name
+        columns = ', '.join(keys)
+        with conn.connection.cursor() as cur:
+            cur.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH CSV", buf)
+
+    @staticmethod
+    def _to_sql_method():
+        """按数据库类型选择 to_sql 的批量写入通道
+
+        PostgreSQL 用 COPY；MySQL 用多行 VALUES（method='multi'）；
+        SQLite 保持默认 executemany——multi 形式容易撞上单语句绑定
+        变量上限（老版本仅 999 个）。
+        """
+        if config.db_type == 'postgresql':
+            return DataStorage._psql_copy
+        if config.db_type == 'mysql':
+            return 'multi'
+        return None
 
     def save_to_database(
         self,
@@ -512,14 +885,30 @@ class DataStorage:
             return False
 
         try:
+            df = self._downcast(df)
+
+            # SQLite：date 列先转原生 date 对象，落盘为 '2026-01-21'——
+            # to_sql 按帧 dtype 推断类型，datetime64 列会绑成零点格式，
+            # 与增量路径（模型的 DATE 变体）及历史行不一致
+            if (config.db_type == 'sqlite' and 'date' in df.columns
+                    and pd.api.types.is_datetime64_any_dtype(df['date'])):
+                df = df.copy(deep=False)
+                df['date'] = pd.Series(
+                    df['date'].to_numpy().astype('datetime64[D]').tolist(),
+                    index=df.index, dtype=object,
+                )
+
             # 获取数据总量
             total_rows = len(df)
 
-            logger.debug(f"开始保存数据到数据库表: {table_name}, 共 {total_rows} 条记录")
+            logger.debug("开始保存数据到数据库表: %s, 共 %s 条记录", table_name, total_rows)
+
+            method = self._to_sql_method()
 
             # 如果数据量小于批处理大小，直接保存
             if total_rows <= batch_size:
-                df.to_sql(table_name, self.engine, if_exists='append', index=False)
+                df.to_sql(table_name, self.engine, if_exists='append', index=False,
+                          method=method, chunksize=batch_size)
                 logger.info(f"数据已保存到数据库表: {table_name}")
                 return True
 
@@ -529,29 +918,31 @@ class DataStorage:
             # 计算批次数
             num_batches = (total_rows + batch_size - 1) // batch_size
 
-            # 创建进度条
-            iterator = tqdm(range(num_batches), desc="保存到数据库") if config.use_tqdm else range(num_batches)
+            # 确保datetime不是索引而是列（不做防御性整帧拷贝，后面只读切片）
+            df_to_save = self._reset_datetime_index(df)
 
-            # 确保datetime不是索引而是列
-            df_to_save = df.copy()
-            if df_to_save.index.name == 'datetime' or isinstance(df_to_save.index, pd.DatetimeIndex):
-                df_to_save = df_to_save.reset_index()
+            # 一次切好全部批次（视图切片，不复制数据），免去逐迭代的
+            # 下标运算；边界由 NumPy 均摊计算（np.array_split 直接切
+            # DataFrame 会走 pandas 已弃用的 swapaxes 路径，只切行号）
+            edges = np.linspace(0, total_rows, num_batches + 1, dtype=int)
+            batches = [df_to_save.iloc[s:e] for s, e in zip(edges[:-1], edges[1:])]
+            iterator = tqdm(batches, desc="保存到数据库") if config.use_tqdm else batches
 
-            # 分批保存
-            for i in iterator:
-                start_idx = i * batch_size
-                end_idx = min((i + 1) * batch_size, total_rows)
-                batch_df = df_to_save.iloc[start_idx:end_idx]
+            # 表存在性只查一次：首批之后必然存在，逐批 inspect 是白付的元数据往返
+            table_exists = inspect(self.engine).has_table(table_name)
 
-                # 保存当前批次
-                # 使用正确的方法检查表是否存在
-                from sqlalchemy import inspect
-                inspector = inspect(self.engine)
-                if_exists = 'append' if i > 0 or inspector.has_table(table_name) else 'replace'
-                batch_df.to_sql(table_name, self.engine, if_exists=if_exists, index=False)
+            # 分批保存：所有批次共用一个连接、一个事务——按 Engine 逐批调用
+            # to_sql 每批都要取连接 + 隐式提交（多数数据库一次 fsync）
+            saved = 0
+            with self.engine.begin() as conn:
+                for batch_df in iterator:
+                    if_exists = 'append' if saved > 0 or table_exists else 'replace'
+                    batch_df.to_sql(table_name, conn, if_exists=if_exists, index=False,
+                                    method=method, chunksize=batch_size)
 
-                if not config.use_tqdm:
-                    logger.info(f"已保存 {end_idx}/{total_rows} 条记录到数据库表 {table_name}")
+                    saved += len(batch_df)
+                    if not config.use_tqdm:
+                        logger.info(f"已保存 {saved}/{total_rows} 条记录到数据库表 {table_name}")
 
             logger.info(f"所有数据已成功保存到数据库表: {table_name}")
             return True
@@ -581,7 +972,7 @@ class DataStorage:
         db_success = False
 
         if to_csv:
-            csv_path = self.save_to_csv(df, 'daily_data')
+            csv_path = self._save_file(df, 'daily_data')
 
         if to_db:
             db_success = self.save_to_database(df, 'daily_data', batch_size=batch_size)
@@ -612,7 +1003,7 @@ class DataStorage:
         db_success = False
 
         if to_csv:
-            csv_path = self.save_to_csv(df, f'minute{freq}_data')
+            csv_path = self._save_file(df, f'minute{freq}_data')
 
         if to_db:
             db_success = self.save_to_database(df, f'minute{freq}_data', batch_size=batch_size)
@@ -651,7 +1042,8 @@ class DataStorage:
             try:
                 with self.engine.begin() as conn:
                     conn.execute(text("DELETE FROM stock_info"))
-                    df.to_sql('stock_info', conn, if_exists='append', index=False, chunksize=batch_size)
+                    df.to_sql('stock_info', conn, if_exists='append', index=False,
+                              chunksize=batch_size, method=self._to_sql_method())
                 db_success = True
                 logger.info(f"股票列表已入库: {len(df)} 条")
             except Exception as e:
@@ -696,6 +1088,7 @@ class DataStorage:
                     df.to_sql(
                         'block_stock_relation', conn,
                         if_exists='append', index=False, chunksize=batch_size,
+                        method=self._to_sql_method(),
                     )
                 db_success = True
             except Exception as e:
@@ -1,9 +1,11 @@
 """processor 纯函数单元测试（CI pytest 步骤的最小真实测试套件，issue #14）"""
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from tdx2db.processor import DataProcessor, MA_WINDOWS
+import tdx2db.processor as processor_mod
+from tdx2db.processor import DataProcessor, MA_WINDOWS, _RESAMPLE_AGG
 
 
 @pytest.fixture
@@ -44,6 +46,116 @@ class TestFilterData:
         assert DataProcessor.filter_data(empty, start_date='2026-01-01').empty
 
 
+@pytest.fixture
+def min5_df():
+    """单股票两个交易日、会话形状（上午 09:35-11:30 / 下午 13:05-15:00）的
+    5 分钟帧——桶边界等价性必须在真实的带午休间隔数据上验证"""
+    rng = np.random.default_rng(20260105)
+    parts = []
+    for day in ('2026-01-05', '2026-01-06'):
+        parts.append(pd.date_range(f'{day} 09:35', f'{day} 11:30', freq='5min'))
+        parts.append(pd.date_range(f'{day} 13:05', f'{day} 15:00', freq='5min'))
+    dt_index = parts[0].append(parts[1:])
+    n = len(dt_index)
+    close = (10 + rng.random(n)).round(2)
+    df = pd.DataFrame({
+        'datetime': dt_index,
+        'open': close + 0.1, 'high': close + 0.3, 'low': close - 0.3, 'close': close,
+        'volume': rng.integers(100, 10000, n).astype(float),
+        'amount': close * 100,
+        'code': '000001', 'market': 0,
+    })
+    df['date'] = df['datetime'].dt.normalize()
+    return df
+
+
+def _resample_baseline(df, freq):
+    """重写前的实现：set_index + resample().agg()，作为语义基准"""
+    out = (df.set_index('datetime')
+             .resample(freq)
+             .agg(dict(_RESAMPLE_AGG))
+             .dropna()
+             .reset_index())
+    out['date'] = out['datetime'].dt.normalize()
+    out['code'] = df['code'].iloc[0]
+    out['market'] = df['market'].iloc[0]
+    return out
+
+
+class TestResampleOhlcv:
+    """chunk 重写回归：整除分桶/级联重采样必须与 resample().agg() 等价"""
+
+    @pytest.mark.parametrize('freq', ['15min', '30min', '60min'])
+    def test_matches_pandas_resample(self, min5_df, freq):
+        got = DataProcessor.resample_ohlcv(min5_df, freq)
+        expected = _resample_baseline(min5_df, freq)
+        pd.testing.assert_frame_equal(got[expected.columns], expected)
+
+    def test_cascade_equals_direct(self, min5_df):
+        """15→30→60 级联重采样与直接从 5 分钟重采样逐帧一致
+        （15/30/60 均整除一天，桶边界嵌套）"""
+        r15 = DataProcessor.resample_ohlcv(min5_df, '15min')
+        r30 = DataProcessor.resample_ohlcv(r15, '30min')
+        r60 = DataProcessor.resample_ohlcv(r30, '60min')
+        for freq, cascaded in (('30min', r30), ('60min', r60)):
+            direct = DataProcessor.resample_ohlcv(min5_df, freq)
+            pd.testing.assert_frame_equal(
+                cascaded[direct.columns], direct, check_exact=False)
+
+
+@pytest.fixture
+def ma_df():
+    """代码交错、长短不一的多股票帧：覆盖分段切片与原行序还原，
+    且最长股票超过 250 行，让全部窗口都有非 NaN 输出"""
+    rng = np.random.default_rng(7)
+    frames = []
+    for code, n in (('000001', 300), ('600000', 280), ('300750', 30)):
+        frames.append(pd.DataFrame({
+            'code': code,
+            'close': (10 + rng.random(n)).round(2),
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    # 打乱行序：实现内部按 code 稳定排序分段，必须还原到输入行序
+    return df.sample(frac=1, random_state=7).reset_index(drop=True)
+
+
+def _ma_baseline(df):
+    """重写前的实现：groupby().rolling().mean()，作为语义基准"""
+    out = df.copy()
+    for w in MA_WINDOWS:
+        out[f'ma{w}'] = out.groupby('code')['close'].transform(
+            lambda s, w=w: s.rolling(window=w).mean())
+    return out
+
+
+class TestCalculateMaImplementations:
+    """三条均线实现（polars / numba / numpy-cumsum）按 import 可用性静默选择，
+    任一 CI 环境只会跑到其中一条——在此把三条都钉到 rolling().mean() 基准"""
+
+    def _assert_matches_baseline(self, df):
+        got = DataProcessor._calculate_ma(df.copy())
+        expected = _ma_baseline(df)
+        for w in MA_WINDOWS:
+            np.testing.assert_allclose(
+                got[f'ma{w}'], expected[f'ma{w}'], rtol=1e-9, err_msg=f'ma{w}')
+
+    def test_numpy_fallback(self, ma_df, monkeypatch):
+        monkeypatch.setattr(processor_mod, 'pl', None)
+        monkeypatch.setattr(processor_mod, '_ma_kernel', None)
+        self._assert_matches_baseline(ma_df)
+
+    def test_numba_kernel(self, ma_df, monkeypatch):
+        if processor_mod._ma_kernel is None:
+            pytest.skip('numba 未安装')
+        monkeypatch.setattr(processor_mod, 'pl', None)
+        self._assert_matches_baseline(ma_df)
+
+    def test_polars_path(self, ma_df):
+        if processor_mod.pl is None:
+            pytest.skip('polars 未安装')
+        self._assert_matches_baseline(ma_df)
+
+
 class TestProcessDailyData:
     def test_ma_columns_added(self, daily_df):
         out = DataProcessor.process_daily_data(daily_df)
@@ -28,6 +28,23 @@ def _daily_df():
     ])
 
 
+@pytest.mark.parametrize('db_type,driver,url', [
+    ('sqlite', None, 'sqlite://'),
+    ('postgresql', 'psycopg2', 'postgresql+psycopg2://u:p@localhost/db'),
+    ('mysql', 'pymysql', 'mysql+pymysql://u:p@localhost/db'),
+])
+def test_engine_constructs_for_each_dialect(monkeypatch, tmp_path, db_type, driver, url):
+    """每种 db_type 的引擎都能构造——方言专属 create_engine 参数写错会在
+    构造期抛 TypeError（无需真实服务器，create_engine 不建立连接）。
+    回归：executemany_values_page_size 在 SQLAlchemy 2.0 已移除，
+    曾让所有 PostgreSQL 用户启动即崩"""
+    if driver:
+        pytest.importorskip(driver)
+    monkeypatch.setattr(config, 'db_type', db_type)
+    storage = DataStorage(db_url=url, csv_path=str(tmp_path), create_tables=False)
+    assert storage.engine.dialect.name == db_type
+
+
 def test_create_all_builds_unique_constraints(sqlite_storage):
     """create_all 自动携带唯一约束，新用户无需手动跑迁移脚本"""
     insp = inspect(sqlite_storage.engine)
@@ -98,6 +115,34 @@ def test_save_stock_info_snapshot_replace(sqlite_storage):
         assert conn.execute(text("SELECT COUNT(*) FROM stock_info")).scalar() == 1  # 旧快照仍在
 
 
+def test_flush_csv_reraises_background_write_failure(tmp_path, monkeypatch):
+    """异步写盘失败必须在 flush_csv() 重抛——否则 --csv-only 一行没写还退出 0
+    （cron 用户靠退出码监控）"""
+    monkeypatch.setattr(config, 'db_type', 'sqlite')
+    storage = DataStorage(db_url='sqlite://', csv_path=str(tmp_path))
+    (tmp_path / 'daily_data.csv').mkdir()  # 目标路径是目录，写盘确定性失败
+
+    storage.save_to_csv(_daily_df(), 'daily_data')
+    with pytest.raises(Exception):
+        storage.flush_csv()
+    storage.flush_csv()  # 异常只上报一次，之后实例可继续使用
+
+
+def test_sqlite_date_column_stored_as_date_only_text(sqlite_storage):
+    """SQLite 的 date 列必须落盘为 '2026-01-05' 而非 '2026-01-05 00:00:00.000000'：
+    历史行是前者格式，混用会让消费方 WHERE date = '...' 等值过滤漏行"""
+    df = _daily_df()
+    sqlite_storage.save_incremental(df, 'daily_data', conflict_columns=('code', 'date'))
+    sqlite_storage.save_to_database(df.assign(code='300750'), 'daily_data')
+
+    with sqlite_storage.engine.connect() as conn:
+        lens = conn.execute(text("SELECT DISTINCT length(date) FROM daily_data")).fetchall()
+        assert lens == [(10,)], lens  # 两条写入路径都是 'YYYY-MM-DD'
+        hit = conn.execute(text(
+            "SELECT COUNT(*) FROM daily_data WHERE date = '2026-01-05'")).scalar()
+        assert hit == 3  # 等值过滤同时命中增量与全量路径写的行
+
+
 def test_get_latest_datetime_returns_datetime_on_sqlite(sqlite_storage):
     """SQLite 的 MAX() 返回 TEXT，必须归一化为 datetime，
     否则增量同步 latest + timedelta 崩溃（第二次 sync 全失败）"""